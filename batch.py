@@ -0,0 +1,123 @@
+"""
+Headless batch classification of agency files, e.g. from cron:
+
+    python batch.py dump1.csv dump2.xlsx --out results/
+
+Writes pending.csv, rejected.csv, unknown.csv and selected_influencers.xlsx
+to --out, classifying against the on-disk influencer snapshot that the app
+refreshes on every load (or a fresh copy with --credentials).
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from ingest import (
+    COLUMN_ALIASES, SNAPSHOT_PATH, classify, derive_metrics, load_snapshot, normalize_influencers,
+    normalize_upload, read_upload, save_snapshot, write_export
+)
+
+DEFAULT_SHEET_ID = "1pFpU-ClSWJx2bFEdbZzaH47vedgtI8uxhDVXSKX0ZkE"
+INF_SHEET = "Influencers List"
+CHUNK_ROWS = 50_000
+
+# Every chunk of every file is written with the same columns, in this order,
+# so files with different layouts line up under one header
+OUTPUT_COLUMNS = {
+    "pending": ["ID", *[c for c in COLUMN_ALIASES if c != "ID"], "Cost per follower", "Source file", "Link"],
+    "rejected": ["ID", "Comment", "Link"],
+    "unknown": ["ID", "Link"],
+}
+
+
+# ---------------- Influencer List ----------------
+def refresh_snapshot(credentials, sheet_id, path):
+    """Download the influencer list with a service-account file and update the snapshot."""
+    import gspread
+    import sheets_io
+    from shards import open_table
+    from utils import make_unique_headers
+
+    client = gspread.service_account(filename=credentials)
+    table = open_table(sheets_io.open_worksheets(client, sheet_id), INF_SHEET)
+    if table is None:
+        raise ValueError(f"Worksheet '{INF_SHEET}' not found")
+    data = sheets_io.fetch_values([table])[0]
+    inf_df = pd.DataFrame(data[1:], columns=make_unique_headers(data[0])) if data else pd.DataFrame(columns=["ID"])
+    inf_df = normalize_influencers(inf_df)
+    save_snapshot(inf_df, path)
+    return inf_df[["ID", "Comment", "Credibility"]]
+
+
+# ---------------- Streaming Input ----------------
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield normalized frames: CSVs in chunks of `chunk_rows`, spreadsheets whole."""
+    name = os.path.basename(path)
+    if path.lower().endswith(".csv"):
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield normalize_upload(chunk).assign(**{"Source file": name})
+    else:
+        with open(path, "rb") as f:
+            yield normalize_upload(read_upload(name, f.read())).assign(**{"Source file": name})
+
+
+def run(files, out_dir, inf_df, chunk_rows=CHUNK_ROWS):
+    """
+    Classify every file chunk by chunk, appending to the output CSVs in the
+    OUTPUT_COLUMNS layout. Returns row counts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = {k: os.path.join(out_dir, f"{k}.csv") for k in ("pending", "rejected", "unknown")}
+    for path in outputs.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+    seen, selected = set(), []
+    counts = dict.fromkeys(outputs, 0)
+    for file in files:
+        for chunk in iter_chunks(file, chunk_rows):
+            # First occurrence of an ID across all files wins
+            chunk = chunk.drop_duplicates("ID")
+            chunk = derive_metrics(chunk[~chunk["ID"].isin(seen)].copy())
+            seen.update(chunk["ID"])
+
+            results = dict(zip(outputs, classify(chunk, inf_df)))
+            for key, frame in results.items():
+                frame.reindex(columns=OUTPUT_COLUMNS[key]).to_csv(
+                    outputs[key], mode="a", header=not os.path.exists(outputs[key]), index=False
+                )
+                counts[key] += len(frame)
+            selected.append(results["pending"])
+
+    pending = pd.concat(selected, ignore_index=True) if selected else pd.DataFrame(columns=["ID", "Link"])
+    write_export(pending, os.path.join(out_dir, "selected_influencers.xlsx"))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify agency influencer files without the web UI.")
+    parser.add_argument("files", nargs="+", help="input .csv/.xlsx/.xls files")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH, help="influencer snapshot (parquet)")
+    parser.add_argument("--credentials", help="service-account JSON; refreshes the snapshot from Google Sheets first")
+    parser.add_argument("--sheet-id", default=DEFAULT_SHEET_ID, help="spreadsheet holding the Influencers List")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per CSV chunk")
+    args = parser.parse_args()
+
+    try:
+        if args.credentials:
+            inf_df = refresh_snapshot(args.credentials, args.sheet_id, args.snapshot)
+        else:
+            inf_df = load_snapshot(args.snapshot)
+    except Exception as e:
+        print(f"Failed to load influencer list: {e}", file=sys.stderr)
+        return 1
+
+    counts = run(args.files, args.out, inf_df, args.chunk_rows)
+    print(", ".join(f"{key}: {n}" for key, n in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import pandas as pd
+
+# ---------------- Facet Index ----------------
+class FacetIndex:
+    """
+    Counts per (credibility, comment) pair plus row labels per facet value.
+    Built once per table snapshot and kept in sync with O(1) add/update/remove,
+    so scorecards, filter options and filtered views never rescan the table.
+    Row order follows the index labels, so new rows must get labels that
+    sort where they are displayed.
+    """
+
+    def __init__(self, df, cred_col="Credibility", comment_col="Comment"):
+        self.cred_col = cred_col
+        self.comment_col = comment_col
+        self.counts = {}
+        self.by_cred = {}
+        self.by_comment = {}
+        self.rows = {}
+
+        comments = df[comment_col] if comment_col in df.columns else pd.Series(None, index=df.index)
+        for label, cred, comment in zip(df.index, df[cred_col].tolist(), comments.tolist()):
+            self._insert(label, cred, comment)
+
+    @staticmethod
+    def _key(comment):
+        return None if pd.isna(comment) else comment
+
+    def _insert(self, label, cred, comment):
+        cred, comment = bool(cred), self._key(comment)
+        self.rows[label] = (cred, comment)
+        self.counts[(cred, comment)] = self.counts.get((cred, comment), 0) + 1
+        self.by_cred.setdefault(cred, set()).add(label)
+        self.by_comment.setdefault(comment, set()).add(label)
+
+    def remove(self, label):
+        """Drop a row from every facet."""
+        if label not in self.rows:
+            return
+        cred, comment = self.rows.pop(label)
+        self.counts[(cred, comment)] -= 1
+        if not self.counts[(cred, comment)]:
+            del self.counts[(cred, comment)]
+        self.by_cred[cred].discard(label)
+        self.by_comment[comment].discard(label)
+        if not self.by_comment[comment]:
+            del self.by_comment[comment]
+
+    def add(self, label, cred, comment):
+        """Register a newly added row."""
+        self.remove(label)
+        self._insert(label, cred, comment)
+
+    def update(self, label, cred, comment):
+        """Move an edited row to its new facets."""
+        self.add(label, cred, comment)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def count(self, cred):
+        """Number of rows with the given credibility."""
+        return len(self.by_cred.get(bool(cred), ()))
+
+    def comment_options(self):
+        """Distinct non-empty comments currently in the table."""
+        return sorted(c for c in self.by_comment if c is not None)
+
+    def select(self, cred="All", comment="All"):
+        """Row labels matching the filters, in table order."""
+        if cred == "All" and comment == "All":
+            return sorted(self.rows)
+        if cred == "All":
+            labels = self.by_comment.get(comment, set())
+        elif comment == "All":
+            labels = self.by_cred.get(bool(cred), set())
+        else:
+            labels = self.by_cred.get(bool(cred), set()) & self.by_comment.get(comment, set())
+        return sorted(labels)
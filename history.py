@@ -0,0 +1,121 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from id_codes import ID_CODE, get_id_dictionary, id_codes
+
+DATE_COL = "Publication Date (Gregorian)"
+MAX_POINTS_PER_TRACE = 200
+
+
+# ---------------- Master Version ----------------
+def master_version(master_df):
+    """Cheap content stamp for a loaded Master frame (row count + last row)."""
+    if master_df is None or master_df.empty:
+        return "empty"
+    last_row = "".join(map(str, master_df.iloc[-1].tolist()))
+    return hashlib.md5(f"{len(master_df)}-{last_row}".encode()).hexdigest()
+
+
+# ---------------- Compare History ----------------
+def downsample(history, max_points=MAX_POINTS_PER_TRACE):
+    """
+    Keep at most `max_points` rows per ID: the first row of each of
+    `max_points` equal buckets, plus the latest row. `history` must be
+    sorted by ID and date.
+    """
+    pos = history.groupby("ID", sort=False).cumcount().to_numpy()
+    size = history.groupby("ID", sort=False)["ID"].transform("size").to_numpy()
+    bucket = pos * max_points // size
+    prev_bucket = (pos - 1) * max_points // size
+    keep = (size <= max_points) | (pos == 0) | (bucket != prev_bucket) | (pos == size - 1)
+    return history[keep]
+
+
+def history_figure(master_df, ids, metric, mode="Combined"):
+    """
+    One figure for every compared influencer: one trace per ID ("Combined")
+    or one panel per ID ("Small multiples"). Returns (figure dict, IDs found).
+    """
+    if master_df is None or "ID" not in master_df.columns or DATE_COL not in master_df.columns:
+        return None, []
+
+    dictionary = get_id_dictionary()
+    wanted = dictionary.encode(list(ids))
+    history = master_df[np.isin(id_codes(master_df, dictionary=dictionary), wanted)].copy()
+    history["ID"] = history["ID"].astype(str)
+    history[DATE_COL] = pd.to_datetime(history[DATE_COL], errors="coerce")
+    history[metric] = pd.to_numeric(history[metric], errors="coerce")
+    history = history.dropna(subset=[DATE_COL]).sort_values(["ID", DATE_COL])
+    if history.empty:
+        return None, []
+
+    history = downsample(history)
+    found = history["ID"].unique().tolist()
+    small_multiples = mode == "Small multiples" and len(found) > 1
+
+    fig = px.line(
+        history,
+        x=DATE_COL,
+        y=metric,
+        color="ID",
+        markers=True,
+        facet_col="ID" if small_multiples else None,
+        facet_col_wrap=3,
+        hover_data={"Campaign name": True} if "Campaign name" in history.columns else None,
+        title=f"📊 {metric} Over Time",
+    )
+    fig.update_layout(xaxis_title="Publication Date", yaxis_title=metric)
+    if small_multiples:
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split("=")[-1]))
+        fig.update_layout(height=300 * ((len(found) + 2) // 3), showlegend=False)
+        fig.update_yaxes(matches=None)
+    return fig.to_dict(), found
+
+
+# ---------------- History Aggregates ----------------
+HISTORY_COLS = [
+    "Last Price", "Median Price", "Min Price", "Max Price", "Price Trend %",
+    "Last Follower", "Median Follower", "Min Follower", "Max Follower",
+    "Campaigns", "Last Campaign",
+]
+
+
+def history_aggregates(master_df, dictionary=None):
+    """
+    Per-ID pricing and follower stats from Master, computed with one integer
+    groupby on ID codes. "Price Trend %" is the change from the first to the
+    latest known price. Returns a frame indexed by ID code (in `dictionary`,
+    the current one by default) with HISTORY_COLS.
+    """
+    if master_df is None or "ID" not in master_df.columns:
+        return pd.DataFrame(columns=HISTORY_COLS, index=pd.Index([], name=ID_CODE))
+
+    h = pd.DataFrame({ID_CODE: id_codes(master_df, dictionary=dictionary)})
+    for col in ["Post Price", "Follower"]:
+        h[col] = pd.to_numeric(master_df[col], errors="coerce") if col in master_df.columns else float("nan")
+    h[DATE_COL] = pd.to_datetime(master_df[DATE_COL], errors="coerce") if DATE_COL in master_df.columns else pd.NaT
+    h["Campaign"] = master_df["Campaign name"] if "Campaign name" in master_df.columns else h.index
+    h = h.sort_values(DATE_COL, kind="stable", na_position="first")
+
+    g = h.groupby(ID_CODE, sort=False)
+    aggs = g.agg(**{
+        "Last Price": ("Post Price", "last"),
+        "Median Price": ("Post Price", "median"),
+        "Min Price": ("Post Price", "min"),
+        "Max Price": ("Post Price", "max"),
+        "Last Follower": ("Follower", "last"),
+        "Median Follower": ("Follower", "median"),
+        "Min Follower": ("Follower", "min"),
+        "Max Follower": ("Follower", "max"),
+        "Campaigns": ("Campaign", "nunique"),
+        "Last Campaign": (DATE_COL, "max"),
+    })
+    # A first price of 0 has no meaningful trend
+    first_price = g["Post Price"].first()
+    first_price = first_price.where(first_price != 0)
+    aggs["Price Trend %"] = ((aggs["Last Price"] - first_price) / first_price * 100).round(1)
+    aggs["Last Campaign"] = aggs["Last Campaign"].dt.strftime("%Y-%m-%d")
+    return aggs[HISTORY_COLS]
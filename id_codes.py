@@ -0,0 +1,148 @@
+"""
+Process-wide interned influencer IDs.
+
+Every ID seen by the app gets a small integer code, so frames can carry an
+int32 "ID code" column and join, group and test membership on integers
+instead of re-hashing strings. Codes are process-local: never persist them or
+share them between processes.
+
+The dictionary is bounded: once it holds MAX_IDS IDs it is replaced by an
+empty one of the next generation. Frames record the generation of their codes
+in df.attrs, and id_codes() re-encodes frames from an older generation, so
+codes of different generations are never compared. Code that joins several
+frames takes one dictionary and passes it to every id_codes() call.
+
+canonical_ids gives every ID the one form used for matching: no profile URL,
+query string or @ prefix, lower case, no invisible Unicode.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+ID_CODE = "ID code"
+GENERATION = "id_generation"  # df.attrs key: dictionary generation of the ID code column
+MAX_IDS = int(os.environ.get("INFLUENCER_MAX_INTERNED_IDS", "1000000"))
+
+
+# ---------------- Canonical IDs ----------------
+# Zero-width characters, bidi marks, word joiners, BOM and soft hyphen
+_INVISIBLE = re.compile("[\u00ad\u200b-\u200f\u202a-\u202e\u2060-\u2064\ufeff]")
+# Instagram profile URLs; the www./m. prefix is only stripped as part of the host: "m.rezaei" is a handle
+_PROFILE = re.compile(r"^(?:https?://)?(?:www\.|m\.)?instagram\.com/@?([^/?#\s]*)", re.I)
+_HANDLE = re.compile(r"^@?([^/?#\s]*)")
+# Post, reel and story links are not profiles: they are kept as they are
+_NON_PROFILE = re.compile(r"^(?:https?://)?(?:(?:www\.|m\.)?instagram\.com/)(?:p|reel|reels|tv|stories|explore)/", re.I)
+
+
+def canonical_id(value):
+    """
+    Canonical form of one ID, e.g. "https://instagram.com/Foo.Bar/?hl=en" -> "foo.bar".
+    Links to anything but an Instagram profile are kept whole, so two TikTok
+    profiles never collapse into one ID.
+    """
+    if value is None or value != value:
+        return ""
+    text = _INVISIBLE.sub("", str(value)).strip().lower()
+    if _NON_PROFILE.match(text):
+        return text
+    profile = _PROFILE.match(text)
+    if profile:
+        return profile.group(1)
+    if "/" in text:
+        return text
+    return _HANDLE.match(text).group(1)
+
+
+def canonical_ids(ids):
+    """
+    canonical_id for a whole column. Each distinct raw value is cleaned once
+    (factorize, then vectorized string ops over the uniques) and broadcast back.
+    """
+    series = pd.Series(ids, dtype=object) if not isinstance(ids, pd.Series) else ids
+    labels, uniques = pd.factorize(series, use_na_sentinel=False)
+    text = (
+        pd.Series(uniques, dtype=object).astype("string").fillna("")
+        .str.replace(_INVISIBLE, "", regex=True)
+        .str.strip().str.lower()
+    )
+    profile = text.str.extract(_PROFILE, expand=False)
+    handle = text.str.extract(_HANDLE, expand=False).fillna("")
+    clean = profile.fillna(handle.where(~text.str.contains("/", regex=False), text))
+    clean = clean.where(~text.str.match(_NON_PROFILE), text)
+    return pd.Series(clean.to_numpy(dtype=object)[labels], index=series.index, name=series.name, dtype=object)
+
+
+class IdDictionary:
+    """Append-only, thread-safe ID <-> code mapping."""
+
+    def __init__(self, generation=0):
+        self.generation = generation
+        self._lock = threading.Lock()
+        self._codes = {}
+        self._ids = []
+        self._array = np.empty(0, dtype=object)  # snapshot of _ids for decode
+
+    def __len__(self):
+        return len(self._ids)
+
+    def encode(self, ids):
+        """int32 codes for an array-like of IDs; each distinct string is hashed once."""
+        labels, uniques = pd.factorize(pd.Series(ids, dtype=object).astype(str), use_na_sentinel=False)
+        with self._lock:
+            unique_codes = np.empty(len(uniques), dtype=np.int32)
+            for i, value in enumerate(uniques):
+                code = self._codes.get(value)
+                if code is None:
+                    code = self._codes[value] = len(self._ids)
+                    self._ids.append(value)
+                unique_codes[i] = code
+        return unique_codes[labels]
+
+    def code(self, value):
+        """Code of one ID, or -1 if it has never been seen."""
+        return self._codes.get(str(value), -1)
+
+    def decode(self, codes):
+        """IDs for an array of codes, as an object array."""
+        with self._lock:
+            if len(self._array) != len(self._ids):
+                self._array = np.asarray(self._ids, dtype=object)
+            ids = self._array
+        return ids[np.asarray(codes, dtype=np.int64)]
+
+
+_dictionary = IdDictionary()
+_dictionary_lock = threading.Lock()
+
+def get_id_dictionary():
+    """
+    The process-wide ID dictionary (see process_state), replaced by a fresh
+    generation once it holds MAX_IDS IDs.
+    """
+    global _dictionary
+    with _dictionary_lock:
+        if len(_dictionary) >= MAX_IDS:
+            _dictionary = IdDictionary(_dictionary.generation + 1)
+        return _dictionary
+
+
+def add_id_codes(df, id_col="ID", dictionary=None):
+    """Add (or refresh) the ID code column of a frame in place and return it."""
+    dictionary = get_id_dictionary() if dictionary is None else dictionary
+    df[ID_CODE] = dictionary.encode(df[id_col].to_numpy())
+    df.attrs[GENERATION] = dictionary.generation
+    return df
+
+
+def id_codes(df, id_col="ID", dictionary=None):
+    """
+    The frame's codes in `dictionary` (the current one by default): its ID code
+    column if that was encoded in the same generation, else computed on the fly.
+    """
+    dictionary = get_id_dictionary() if dictionary is None else dictionary
+    if ID_CODE in df.columns and df.attrs.get(GENERATION) == dictionary.generation:
+        return df[ID_CODE].to_numpy()
+    return dictionary.encode(df[id_col].to_numpy())
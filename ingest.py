@@ -0,0 +1,407 @@
+import hashlib
+import io
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from id_codes import ID_CODE, add_id_codes, canonical_ids, get_id_dictionary, id_codes
+from metrics import derive_metrics
+from persian import add_gregorian_dates, normalize_digits
+from readers import read_table
+
+# ------------------------------------------
+# Column Name Variations (Flexible Mapping)
+# ------------------------------------------
+COLUMN_ALIASES = {
+    "ID": ["id", "username", "user", "profile", "handle", "account", "instagram", "insta"],
+    "Followers": ["followers", "follower", "subs", "audience", "fans", "total followers"],
+    "Post price": ["post price", "price", "rate", "cost", "fee"],
+    "Avg View": ["avg view", "average views", "views", "impressions", "reach"],
+    "IER": ["ier", "engagement rate", "er", "eng rate", "ier%"],
+    "Avg like": ["avg like", "average likes", "likes", "like"],
+    "Avg comments": ["avg comment", "avg comments", "comments", "comment", "average comments"],
+    "Category": ["category", "niche", "genre", "type"],
+    "CPV": ["cpv", "cost per view"]
+}
+
+_TARGETS = list(COLUMN_ALIASES)
+_EXACT = {}
+for _target, _aliases in COLUMN_ALIASES.items():
+    for _alias in _aliases:
+        _EXACT.setdefault(_alias, _target)
+
+# One pattern for every "contains" alias. Each alternative is a lookahead tried
+# at the start of the string, so targets keep their COLUMN_ALIASES priority.
+_CONTAINS = re.compile("^(?:" + "|".join(
+    f"(?=.*(?:{'|'.join(map(re.escape, aliases))}))(?P<t{i}>)"
+    for i, aliases in enumerate(COLUMN_ALIASES.values())
+) + ")", re.S)
+
+
+def clean_header(col):
+    return str(col).lower().strip().replace("_", " ").replace("-", " ")
+
+
+def match_alias(col):
+    """Canonical name for a header, or None when no alias matches."""
+    clean = clean_header(col)
+
+    # Exact match first
+    if clean in _EXACT:
+        return _EXACT[clean]
+
+    # Fallback contains pattern
+    match = _CONTAINS.match(clean)
+    if match:
+        return _TARGETS[int(match.lastgroup[1:])]
+
+    return None
+
+
+def map_column_name(col: str):
+    return match_alias(col) or col
+
+
+# ------------------------------------------
+# Content Sniffing
+# ------------------------------------------
+SNIFF_ROWS = 200
+
+_ID_VALUE = re.compile(r"^(?:https?://)?(?:www\.)?(?:instagram\.com/)?@?[a-z0-9._]{2,30}/?$", re.I)
+_CURRENCY = re.compile(r"[$€£﷼]|toman|تومان|ریال|usd|irr", re.I)
+_HUMAN_COUNT = re.compile(r"^\s*[\d.,]+\s*[kmb]\s*$", re.I)
+
+
+def sniff_column(series):
+    """Guess ID, Followers or Post price from a sample of values; None if unsure."""
+    sample = series.dropna().astype(str).str.strip()
+    sample = sample[sample != ""].head(SNIFF_ROWS)
+    if sample.empty:
+        return None
+    if sample.str.contains(_CURRENCY).mean() >= 0.5:
+        return "Post price"
+    if sample.str.match(_HUMAN_COUNT).mean() >= 0.5:
+        return "Followers"
+    if (sample.str.contains(r"[a-z]", case=False).mean() >= 0.8
+            and sample.str.match(_ID_VALUE).mean() >= 0.8
+            and sample.nunique() == len(sample)):
+        return "ID"
+    return None
+
+
+# ------------------------------------------
+# Header Signature Cache
+# ------------------------------------------
+SIGNATURE_CACHE_SIZE = 256
+
+_signature_cache = {}
+_signature_lock = threading.Lock()
+
+
+def map_columns(df):
+    """
+    Map every header of an uploaded frame to its canonical name.
+    Alias matches are cached per header signature, since the same agency
+    layouts arrive again and again. Headers that match no alias are sniffed
+    for ID, Followers and Post price in every file (two files with the same
+    headers may hold different columns) before falling back to "first column is ID".
+    """
+    signature = tuple(str(c) for c in df.columns)
+    with _signature_lock:
+        matches = _signature_cache.get(signature)
+    if matches is None:
+        matches = tuple(match_alias(col) for col in df.columns)
+        with _signature_lock:
+            if len(_signature_cache) >= SIGNATURE_CACHE_SIZE:
+                _signature_cache.pop(next(iter(_signature_cache)))
+            _signature_cache[signature] = matches
+
+    mapped = [m or str(col) for m, col in zip(matches, df.columns)]
+    for i, match in enumerate(matches):
+        if match:
+            continue
+        target = sniff_column(df.iloc[:, i])
+        if target and target not in mapped:
+            mapped[i] = target
+
+    if "ID" not in mapped and mapped:
+        mapped[0] = "ID"
+    return mapped
+
+
+# ------------------------------------------
+# Humanized Numbers
+# ------------------------------------------
+NUMERIC_COLS = ["Followers", "Post price", "Avg View", "CPV", "IER", "Avg like", "Avg comments"]
+
+_HUMAN_NUMBER = (
+    r"^\s*(?P<sign>-)?\s*(?:[$€£﷼]|usd|irr|toman|تومان|ریال)?\s*"
+    r"(?P<num>\d[\d,]*(?:\.\d+)?|\.\d+)\s*"
+    r"(?P<suffix>k|m|b|bn|mil|million|thousand)?\s*%?\s*"
+    r"(?:[$€£﷼]|usd|irr|toman|تومان|ریال)?\s*$"
+)
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mil": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9}
+
+
+def parse_numbers(series):
+    """
+    Convert a column to floats, understanding "12.5K", "1.2M", "3,400", "$250"
+    and "15%" (kept as 15). Plain numbers take the pd.to_numeric fast path;
+    only the leftovers go through one regex extraction and NumPy arithmetic.
+    Returns (float Series, number of values recovered beyond pd.to_numeric).
+    """
+    values = pd.to_numeric(series, errors="coerce")
+    text = series.astype("string").str.strip()
+    todo = values.isna() & text.notna() & (text != "")
+    if not todo.any():
+        return values, 0
+    values = values.astype(float)
+
+    parts = text[todo].str.extract(_HUMAN_NUMBER, flags=re.I)
+    number = pd.to_numeric(parts["num"].str.replace(",", "", regex=False), errors="coerce").to_numpy(dtype=float)
+    multiplier = parts["suffix"].str.lower().map(_MULTIPLIERS).fillna(1.0).to_numpy(dtype=float)
+    sign = np.where(parts["sign"].notna().to_numpy(), -1.0, 1.0)
+    recovered = number * multiplier * sign
+
+    values[todo] = recovered
+    return values, int(np.count_nonzero(~np.isnan(recovered)))
+
+
+# ------------------------------------------
+# Upload Parsing
+# ------------------------------------------
+
+
+def read_upload(name, data):
+    """Read an uploaded CSV/Excel file from its raw bytes with the fastest engine."""
+    return read_table(name, data)
+
+
+def normalize_upload(df):
+    """Map headers, clean IDs and convert numeric columns."""
+    df = add_gregorian_dates(normalize_digits(df))
+    df.columns = map_columns(df)
+
+    # --- Ensure ID exists ---
+    if "ID" not in df.columns:
+        df.rename(columns={df.columns[0]: "ID"}, inplace=True)
+
+    df["ID"] = canonical_ids(df["ID"])
+
+    # Values that plain to_numeric would have lost, per column
+    recovered = {}
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col], n = parse_numbers(df[col])
+            if n:
+                recovered[col] = n
+    df.attrs["recovered"] = recovered
+    return df
+
+
+def parse_upload(name, data):
+    """Parse one file end to end. Top-level so it can run in a worker process."""
+    df = normalize_upload(read_upload(name, data))
+    df["Source file"] = name
+    return df
+
+
+def combine_uploads(frames):
+    """
+    One candidate row per ID, taking the first non-empty value of each column
+    across files; "Source file" lists every file the ID came from.
+    """
+    if len(frames) == 1:
+        return frames[0].drop_duplicates("ID").reset_index(drop=True)
+    combined = pd.concat(frames, ignore_index=True)
+    sources = combined.drop_duplicates(["ID", "Source file"]).groupby("ID", sort=False)["Source file"].agg(", ".join)
+    combined = combined.groupby("ID", sort=False).first().reset_index()
+    combined["Source file"] = combined["ID"].map(sources)
+    return combined
+
+
+def parse_uploads(files, pool=None, digests=None):
+    """
+    Parse (name, bytes) pairs, combine them and derive missing metrics. With a
+    process pool and more than one file, files are parsed in parallel so wall
+    time follows cores. Given each file's content digest, files parsed before
+    (by any session) are taken from the parsed-upload cache.
+    """
+    digests = digests or [None] * len(files)
+    frames = [cached_upload(d) for d in digests]
+    missing = [i for i, frame in enumerate(frames) if frame is None]
+
+    names = [files[i][0] for i in missing]
+    # bytes() so buffers can be pickled to worker processes
+    datas = [bytes(files[i][1]) for i in missing]
+    if pool is not None and len(missing) > 1:
+        parsed = list(pool.map(parse_upload, names, datas))
+    else:
+        parsed = [parse_upload(name, data) for name, data in zip(names, datas)]
+    for i, frame in zip(missing, parsed):
+        frames[i] = frame
+        cache_upload(digests[i], frame)
+
+    # Same content may arrive under another file name
+    frames = [frame.assign(**{"Source file": name}) for frame, (name, _) in zip(frames, files)]
+    recovered = {}
+    for frame in frames:
+        for col, n in frame.attrs.get("recovered", {}).items():
+            recovered[col] = recovered.get(col, 0) + n
+
+    # Codes come from this process's ID dictionary, never from the workers
+    combined = add_id_codes(derive_metrics(combine_uploads(frames)))
+    combined.attrs["recovered"] = recovered
+    return combined
+
+
+# ------------------------------------------
+# Upload Hashing & Parsed-upload Cache
+# ------------------------------------------
+HASH_CHUNK_SIZE = 1 << 20
+PARSED_CACHE_SIZE = 32
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_parsed_cache = {}
+_parsed_lock = threading.Lock()
+
+
+def upload_digest(buffer):
+    """
+    Content digest of an upload, fed in 1 MiB slices of a memoryview so the
+    file is never copied. xxh3-128 when xxhash is installed, else BLAKE2b.
+    """
+    h = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    view = memoryview(buffer)
+    for start in range(0, len(view), HASH_CHUNK_SIZE):
+        h.update(view[start:start + HASH_CHUNK_SIZE])
+    return h.hexdigest()
+
+
+def cached_upload(digest):
+    """Parsed frame for an upload digest, or None."""
+    if digest is None:
+        return None
+    with _parsed_lock:
+        frame = _parsed_cache.pop(digest, None)
+        if frame is not None:
+            # Most recently used last
+            _parsed_cache[digest] = frame
+    return frame
+
+
+def cache_upload(digest, frame):
+    if digest is None:
+        return
+    with _parsed_lock:
+        _parsed_cache.pop(digest, None)
+        if len(_parsed_cache) >= PARSED_CACHE_SIZE:
+            _parsed_cache.pop(next(iter(_parsed_cache)))
+        _parsed_cache[digest] = frame
+
+
+# ------------------------------------------
+# Influencer Snapshot
+# ------------------------------------------
+SNAPSHOT_PATH = os.environ.get("INFLUENCER_SNAPSHOT", os.path.join(".cache", "influencers.parquet"))
+
+
+def normalize_influencers(inf_df):
+    """Clean the Influencers List frame: canonical IDs, Comment, lower-case Credibility."""
+    inf_df["ID"] = canonical_ids(inf_df.get("ID", inf_df.columns[0]))
+    inf_df["Comment"] = inf_df.get("Comment", pd.Series([""] * len(inf_df)))
+    inf_df["Credibility"] = inf_df.get("Credibility", pd.Series(["False"] * len(inf_df)))
+    inf_df["Credibility"] = inf_df["Credibility"].astype(str).str.lower()
+    return add_id_codes(inf_df)
+
+
+def save_snapshot(inf_df, path=SNAPSHOT_PATH):
+    """Write the classification columns of the influencer list to disk for batch runs."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    inf_df[["ID", "Comment", "Credibility"]].astype(str).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    return pd.read_parquet(path)
+
+
+# ------------------------------------------
+# Classification
+# ------------------------------------------
+INSTAGRAM_URL = "https://www.instagram.com/"
+
+
+def classify(new_df, inf_df, added=None):
+    """
+    Split uploaded candidates by their credibility in the influencer list.
+    `added` maps IDs added since `inf_df` was loaded to {"Comment", "Credibility"}.
+    Matching is done on interned ID codes. Returns (pending_df, rejected_df, unknown_df).
+    """
+    # One dictionary for both sides, so the codes are comparable
+    dictionary = get_id_dictionary()
+    new_codes = id_codes(new_df, dictionary=dictionary)
+    lookup = pd.DataFrame({
+        ID_CODE: id_codes(inf_df, dictionary=dictionary),
+        "Comment": inf_df["Comment"].to_numpy(),
+        "Credibility": inf_df["Credibility"].to_numpy(),
+    })
+    merged_df = new_df.assign(**{ID_CODE: new_codes}).merge(lookup, on=ID_CODE, how="left", suffixes=("", "_sheet"))
+    if added:
+        # Rows added since the list was loaded
+        added = pd.DataFrame.from_dict(added, orient="index")
+        merged_df["Comment"] = merged_df["Comment"].fillna(merged_df["ID"].map(added["Comment"]))
+        merged_df["Credibility"] = merged_df["Credibility"].fillna(merged_df["ID"].map(added["Credibility"]))
+    merged_df["Link"] = INSTAGRAM_URL + merged_df["ID"]
+
+    is_rejected = (merged_df["Credibility"] == "false").to_numpy()
+    is_unknown = merged_df["Credibility"].isna().to_numpy()
+    rejected_df = merged_df.loc[is_rejected, ["ID", "Comment", "Link"]]
+    unknown_df = merged_df.loc[is_unknown, ["ID", "Link"]]
+    excluded = merged_df[ID_CODE].to_numpy()[is_rejected | is_unknown]
+
+    pending_df = new_df[~np.isin(new_codes, excluded)].copy()
+    pending_df["Link"] = INSTAGRAM_URL + pending_df["ID"]
+    return pending_df, rejected_df, unknown_df
+
+
+# ------------------------------------------
+# 20-column Export
+# ------------------------------------------
+EXPORT_COLUMNS = [
+    "", "", "", "", "", "ID", "", "", "", "",
+    "", "Link", "Category", "", "Follower", "IER", "Avg Like", "Avg Comment", "", "Post Price"
+]
+
+
+def build_export(selected):
+    """Lay selected influencers out in the 20-column campaign sheet format."""
+    export_df = pd.DataFrame(columns=[f"col{i}" for i in range(1, 21)])
+    export_df["col6"] = selected["ID"]
+    export_df["col12"] = selected["Link"]
+    export_df["col13"] = selected.get("Category", "")
+    export_df["col15"] = selected.get("Followers", "")
+    export_df["col16"] = selected.get("IER", "")
+    export_df["col17"] = selected.get("Avg like", "")
+    export_df["col18"] = selected.get("Avg comments", "")
+    export_df["col20"] = selected.get("Post price", "")
+    export_df.columns = EXPORT_COLUMNS
+    return export_df
+
+
+def write_export(selected, target=None):
+    """Write the export workbook to `target` (a path), or return it as BytesIO."""
+    output = target if target is not None else io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        build_export(selected).to_excel(writer, index=False, sheet_name="Selected")
+    if target is None:
+        output.seek(0)
+    return output
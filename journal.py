@@ -0,0 +1,200 @@
+import glob
+import json
+import os
+import socket
+import threading
+import time
+
+import pandas as pd
+
+from id_codes import canonical_id
+from process_state import process_alive
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: journals of dead processes are not adopted
+    fcntl = None
+
+# ---------------- Journal Config ----------------
+JOURNAL_DIR = os.environ.get("INFLUENCER_JOURNAL_DIR", ".journal")
+JOURNAL_BATCH_SIZE = 50       # flush once this many entries are pending
+JOURNAL_FLUSH_INTERVAL = 30   # ... or once the oldest pending entry is this old (seconds)
+
+
+# ---------------- Write-Ahead Journal ----------------
+class Journal:
+    """
+    Append-only on-disk log of local edit/add operations.
+    Each entry is fsynced as it is written; "flushed" markers record which
+    entries have been committed to Google Sheets. Unflushed entries survive
+    browser refreshes and server restarts and are replayed on load.
+    The log is shared by every session of this process, and all entries are
+    flushed together. Each entry is tagged with the session that wrote it, so
+    each session replays only its own edits.
+
+    Every process writes its own file (<name>-<host>-<pid>.jsonl), so replicas
+    never interleave sequence numbers or truncate each other's entries. On
+    start, the unflushed entries of dead processes on this host are adopted.
+    """
+
+    def __init__(self, name, directory=JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self._prefix = os.path.join(directory, f"{name}-{socket.gethostname()}-")
+        self.path = f"{self._prefix}{os.getpid()}.jsonl"
+        self._lock = threading.Lock()
+        self._entries = []
+        self._in_flight = set()  # seqs handed to a batch that has not finished yet
+        self._latest = {}        # canonical ID -> seq of its newest entry
+        self._seq = 0
+        if os.path.exists(self.path):
+            # A reused PID: the file is ours
+            self._seq, self._entries = _read_log(self.path)
+        for e in self._entries:
+            self._latest[canonical_id(e["id"])] = e["seq"]
+        self._adopt_orphans()
+
+    def _adopt_orphans(self):
+        """Move unflushed entries of dead processes' journals into this one."""
+        if fcntl is None:
+            return
+        for path in glob.glob(f"{glob.escape(self._prefix)}*.jsonl"):
+            pid = path[len(self._prefix):-len(".jsonl")]
+            if not pid.isdigit() or int(pid) == os.getpid() or process_alive(int(pid)):
+                continue
+            try:
+                f = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # another process is adopting it
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    continue  # adopted and removed while we waited
+                for entry in _read_log(path)[1]:
+                    self.append(entry["op"], entry["id"], entry["comment"], entry["credibility"], entry.get("session"))
+                os.remove(path)
+
+    def _write(self, entry, mode="a"):
+        with open(self.path, mode, encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, op, influencer_id, comment, credibility, session=None):
+        """Durably record an "edit" or "add" of one influencer row made by `session`."""
+        with self._lock:
+            self._seq += 1
+            entry = {
+                "seq": self._seq,
+                "ts": time.time(),
+                "op": op,
+                "id": str(influencer_id),
+                "comment": None if pd.isna(comment) else str(comment),
+                "credibility": bool(credibility),
+                "session": session,
+            }
+            self._write(entry)
+            self._entries.append(entry)
+            self._latest[canonical_id(entry["id"])] = entry["seq"]
+            return entry["seq"]
+
+    def pending(self, session=None):
+        """Unflushed entries, oldest first; only those written by `session` if given."""
+        with self._lock:
+            if session is None:
+                return list(self._entries)
+            return [e for e in self._entries if e.get("session") == session]
+
+    def due(self):
+        """True when the unqueued batch is large or old enough to group-commit."""
+        with self._lock:
+            waiting = [e for e in self._entries if e["seq"] not in self._in_flight]
+            if not waiting:
+                return False
+            return (len(waiting) >= JOURNAL_BATCH_SIZE
+                    or time.time() - waiting[0]["ts"] >= JOURNAL_FLUSH_INTERVAL)
+
+    def take_batch(self):
+        """Hand out entries not yet queued for writing, marking them in flight."""
+        with self._lock:
+            batch = [e for e in self._entries if e["seq"] not in self._in_flight]
+            self._in_flight.update(e["seq"] for e in batch)
+            return batch
+
+    def release(self, batch):
+        """
+        Return the entries of one failed batch for the next one. Entries for an
+        ID that has a newer entry are dropped, so a retry never overwrites it.
+        """
+        with self._lock:
+            self._in_flight.difference_update(e["seq"] for e in batch)
+            superseded = {e["seq"] for e in batch if self._latest.get(canonical_id(e["id"]), 0) > e["seq"]}
+            if superseded:
+                self._drop(superseded)
+
+    def mark_flushed(self, batch):
+        """Record that every entry of `batch` is committed to the sheet."""
+        with self._lock:
+            seqs = {e["seq"] for e in batch}
+            self._in_flight.difference_update(seqs)
+            self._drop(seqs)
+
+    def _drop(self, seqs):
+        self._entries = [e for e in self._entries if e["seq"] not in seqs]
+        if self._entries:
+            self._seq += 1
+            self._write({"seq": self._seq, "ts": time.time(), "op": "flushed", "seqs": sorted(seqs)})
+        else:
+            # Nothing left to replay: start a fresh log
+            self._write({"seq": self._seq, "ts": time.time(), "op": "flushed", "upto": self._seq}, mode="w")
+
+
+def _read_log(path):
+    """(highest seq, unflushed entries) of one journal file."""
+    seq, entries, flushed_upto, flushed = 0, [], 0, set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn write at the tail
+            seq = max(seq, entry["seq"])
+            if entry["op"] == "flushed":
+                flushed_upto = max(flushed_upto, entry.get("upto", 0))
+                flushed.update(entry.get("seqs", ()))
+            else:
+                entries.append(entry)
+    return seq, [e for e in entries if e["seq"] > flushed_upto and e["seq"] not in flushed]
+
+
+def coalesce(entries):
+    """Collapse entries to the final state per ID, keeping "add" if any entry added it."""
+    rows = {}
+    for e in entries:
+        # Entries written before IDs were canonicalized still land on their row
+        row_id = canonical_id(e["id"])
+        prev = rows.get(row_id)
+        op = "add" if prev is not None and prev["op"] == "add" else e["op"]
+        rows[row_id] = {**e, "id": row_id, "op": op}
+    return list(rows.values())
+
+
+def apply_journal(df, entries, id_col, comment_col, cred_col="Credibility"):
+    """Replay unflushed entries onto a freshly loaded table."""
+    if not entries:
+        return df
+    labels = {v: label for label, v in zip(df.index, df[id_col].astype(str))}
+    new_rows = []
+    for e in coalesce(entries):
+        label = labels.get(e["id"])
+        if label is None:
+            new_rows.append({id_col: e["id"], comment_col: e["comment"], cred_col: e["credibility"]})
+        else:
+            df.at[label, comment_col] = e["comment"]
+            df.at[label, cred_col] = e["credibility"]
+    if new_rows:
+        start = (df.index.min() if not df.empty else 0) - len(new_rows)
+        df = pd.concat([pd.DataFrame(new_rows, index=range(start, start + len(new_rows))), df])
+    return df
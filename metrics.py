@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# ---------------- Scoring Config ----------------
+# Positive weights reward high values, negative weights penalize them
+DEFAULT_WEIGHTS = {
+    "IER": 1.0,
+    "Avg View": 0.5,
+    "Followers": 0.25,
+    "CPV": -1.0,
+    "Cost per follower": -0.5,
+}
+
+
+# ---------------- Derived Metrics ----------------
+def _column(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def _ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = num / den
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def derive_metrics(df):
+    """
+    Fill in metrics that can be computed from the uploaded columns, using
+    whole-column NumPy arithmetic: CPV from price and views, IER (%) from
+    likes and comments over followers, and cost per follower. Values that
+    were uploaded are kept.
+    """
+    price = _column(df, "Post price")
+    views = _column(df, "Avg View")
+    followers = _column(df, "Followers")
+    likes = _column(df, "Avg like")
+    comments = _column(df, "Avg comments")
+    engagement = np.where(np.isnan(likes) & np.isnan(comments), np.nan, np.nan_to_num(likes) + np.nan_to_num(comments))
+
+    cpv = _column(df, "CPV")
+    ier = _column(df, "IER")
+    df["CPV"] = np.where(np.isnan(cpv), _ratio(price, views), cpv)
+    df["IER"] = np.where(np.isnan(ier), _ratio(engagement, followers) * 100, ier)
+    df["Cost per follower"] = _ratio(price, followers)
+    return df
+
+
+# ---------------- Scoring & Top-k ----------------
+def score(df, weights=None):
+    """
+    Weighted sum of min-max normalized metrics. Missing values count as the
+    worst case for that metric (0 for rewarded metrics, 1 for penalized ones).
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    total = np.zeros(len(df))
+    for col, weight in weights.items():
+        if not weight:
+            continue
+        values = _column(df, col)
+        lo, hi = np.nanmin(values, initial=np.inf), np.nanmax(values, initial=-np.inf)
+        norm = (values - lo) / (hi - lo) if hi > lo else np.where(np.isnan(values), np.nan, 0.5)
+        total += weight * np.nan_to_num(norm, nan=0.0 if weight > 0 else 1.0)
+    return total
+
+
+def top_k(df, scores, k):
+    """The `k` best-scoring rows, best first, via partial selection instead of a full sort."""
+    k = min(k, len(df))
+    if k <= 0:
+        return df.iloc[[]].assign(Score=[])
+    order = -np.nan_to_num(scores, nan=-np.inf)
+    idx = np.argpartition(order, k - 1)[:k]
+    idx = idx[np.argsort(order[idx], kind="stable")]
+    return df.iloc[idx].assign(Score=np.round(scores[idx], 3))
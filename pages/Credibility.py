@@ -1,8 +1,18 @@
 import streamlit as st
 import pandas as pd
-import hashlib
 import re
-from utils import get_gsheets_client, get_worksheet_by_key, make_unique_headers
+import uuid
+from utils import get_gsheets_client, get_worksheet_by_key, make_unique_headers, report_sync_tickets
+from facets import FacetIndex
+from journal import Journal, apply_journal, coalesce
+from write_queue import get_write_queue
+from reconcile import row_snapshot, diff_snapshots, reconcile
+from upsert import dead_rows, dedupe_batch, needs_compaction, upsert_rows, locate, compact, select_rows
+from spill import track_session, session_fragment
+from profiling import start_rerun_profile
+from sheets_io import fetch_values
+from id_codes import canonical_ids
+from shared_cache import POLL_SECONDS, shared_frames, invalidate
 
 # ----------------------------------------------------------------------
 # 🔧 Helper: Normalize Credibility Column (Fixes Your TypeError)
@@ -32,17 +42,26 @@ st.set_page_config(
 # --- Current page in session ---
 st.session_state.current_page = 'credibility'
 
+# Opt-in CPU/memory capture of this rerun (see profiling.py)
+start_rerun_profile("credibility")
+
 # ----------------------------------------------------------------------
 # --- Session state initialization ---
 # ----------------------------------------------------------------------
 def init_session_state():
     defaults = {
         "full_table": None,
+        "added_rows": None,
         "editor_version": 0,
         "sheet_version": None,
         "sheet_updated": False,
         "data_loaded": False,
         "pending_changes": None,
+        "facets": None,
+        "id_index": None,
+        "row_snapshot": None,
+        "sync_conflicts": [],
+        "sync_tickets": [],
         "new_influencers_df": None,
         "added_influencers": False
     }
@@ -52,23 +71,41 @@ def init_session_state():
 
 init_session_state()
 
+# Large frames are accounted per session and spilled to disk while idle
+track_session(["full_table", "added_rows", "row_snapshot", "pending_changes"])
+
 # ----------------------------------------------------------------------
 # --- Google Sheet Config ---
 # ----------------------------------------------------------------------
 SHEET_URL = "https://docs.google.com/spreadsheets/d/1pFpU-ClSWJx2bFEdbZzaH47vedgtI8uxhDVXSKX0ZkE/edit"
 INF_SHEET = "Influencers List"
 SHEET_ID = re.search(r"/d/([a-zA-Z0-9-_]+)", SHEET_URL).group(1)
+SHARED_SHEET_KEY = f"{SHEET_ID}:credibility-influencers"
 
 # ----------------------------------------------------------------------
 # --- Connect to Google Sheet ---
 # ----------------------------------------------------------------------
-@st.cache_resource(show_spinner=False)
 def get_worksheet():
+    # Handles are cached by the client pool for its metadata TTL
     client = get_gsheets_client()
     return get_worksheet_by_key(client, SHEET_ID, INF_SHEET)
 
+@st.cache_resource(show_spinner=False)
+def get_journal():
+    return Journal(f"{SHEET_ID}-influencers")
+
+def journal_session():
+    """Tag for this tab's journal entries, kept in the URL so it survives a browser refresh."""
+    session = st.query_params.get("session")
+    if not session:
+        session = st.query_params["session"] = uuid.uuid4().hex[:12]
+    return session
+
 try:
     worksheet_influencers = get_worksheet()
+    journal = get_journal()
+    session_id = journal_session()
+    write_queue = get_write_queue()
 except Exception as e:
     st.error(f"❌ Failed to connect to Google Sheets: {e}")
     st.stop()
@@ -76,24 +113,32 @@ except Exception as e:
 # ----------------------------------------------------------------------
 # --- Load sheet version ---
 # ----------------------------------------------------------------------
-@st.cache_data(ttl=60, show_spinner=False)
+def load_sheet_frame(ws):
+    """Raw Influencers List frame, shared by every replica on this host."""
+    def fetch():
+        # Only rows appended since the last read are downloaded
+        values = fetch_values([ws], incremental=True)[0]
+        if not values:
+            return [pd.DataFrame()]
+        return [pd.DataFrame(values[1:], columns=make_unique_headers(values[0]))]
+    version, (frame,) = shared_frames(SHARED_SHEET_KEY, POLL_SECONDS, fetch)
+    return version, frame
+
 def get_sheet_version(_ws):
-    all_values = _ws.get_all_values()
-    last_row = "".join(all_values[-1]) if all_values else ""
-    version_str = f"{len(all_values)}-{last_row}"
-    return hashlib.md5(version_str.encode()).hexdigest()
+    # Content hash of the sheet; one replica on this host re-reads it per POLL_SECONDS
+    return load_sheet_frame(_ws)[0]
 
 # ----------------------------------------------------------------------
 # --- Load sheet data ---
 # ----------------------------------------------------------------------
 @st.cache_data(ttl=120, show_spinner="↺ Loading data from Google Sheets...")
-def load_data(_worksheet_influencers):
-    data = _worksheet_influencers.get_all_values()
-    if not data or len(data) < 2:
+def load_data(_worksheet_influencers, sheet_version):
+    _, frame = load_sheet_frame(_worksheet_influencers)
+    if frame.empty:
         return pd.DataFrame(), None, None, None
 
-    headers = make_unique_headers(data[0])
-    df = pd.DataFrame(data[1:], columns=headers)
+    # The shared frame is read-only
+    df = frame.copy()
 
     def safe_find_column(df, keyword, default_name):
         try:
@@ -108,12 +153,18 @@ def load_data(_worksheet_influencers):
     comment_col = safe_find_column(df, "Comment", "Comment")
 
     df = normalize_credibility(df)
+    # One canonical ID form for matching, computed once per sheet version
+    df[id_col] = canonical_ids(df[id_col])
 
     return df, id_col, cred_col, comment_col
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_row_snapshot(sheet_version, _df, id_col, comment_col):
+    return row_snapshot(_df, id_col, [comment_col, "Credibility"])
+
 try:
     sheet_version = get_sheet_version(worksheet_influencers)
-    influencers_df, id_col, cred_col, comment_col = load_data(worksheet_influencers)
+    influencers_df, id_col, cred_col, comment_col = load_data(worksheet_influencers, sheet_version)
 except Exception as e:
     st.error(f"❌ Error loading data: {e}")
     st.stop()
@@ -122,33 +173,82 @@ except Exception as e:
 # --- Initialize full table ---
 # ----------------------------------------------------------------------
 if influencers_df is not None and not influencers_df.empty:
-    if st.session_state.full_table is None:
-        needed_cols = [c for c in [id_col, comment_col, cred_col] if c in influencers_df.columns]
-        st.session_state.full_table = normalize_credibility(influencers_df[needed_cols].copy())
+    snapshot = load_row_snapshot(sheet_version, influencers_df, id_col, comment_col)
 
-    if st.session_state.sheet_version is None:
+    if st.session_state.full_table is None or st.session_state.row_snapshot is None:
+        needed_cols = [c for c in [id_col, comment_col, cred_col] if c in influencers_df.columns]
+        full_table = apply_journal(
+            normalize_credibility(influencers_df[needed_cols].copy()),
+            journal.pending(session_id), id_col, comment_col
+        )
+        # Facets and the ID index are built once per snapshot and updated incrementally
+        st.session_state.full_table = full_table
+        st.session_state.added_rows = None
+        st.session_state.facets = FacetIndex(full_table, "Credibility", comment_col)
+        st.session_state.id_index = {v: label for label, v in zip(full_table.index, full_table[id_col].astype(str))}
+        st.session_state.row_snapshot = snapshot
         st.session_state.sheet_version = sheet_version
+
     elif st.session_state.sheet_version != sheet_version:
-        needed_cols = [c for c in [id_col, comment_col, cred_col] if c in influencers_df.columns]
-        st.session_state.full_table = normalize_credibility(influencers_df[needed_cols].copy())
+        # Apply only the rows that changed remotely; unsynced local edits are kept
+        local_ids = {e["id"] for e in journal.pending(session_id)}
+        buffer, changed, conflicts = reconcile(
+            st.session_state.full_table,
+            st.session_state.added_rows,
+            st.session_state.id_index,
+            st.session_state.facets,
+            influencers_df,
+            snapshot,
+            diff_snapshots(st.session_state.row_snapshot, snapshot),
+            local_ids,
+            id_col,
+            comment_col
+        )
+        if needs_compaction(st.session_state.full_table, buffer, st.session_state.facets):
+            st.session_state.full_table = compact(st.session_state.full_table, buffer, st.session_state.facets)
+            buffer = None
+        st.session_state.added_rows = buffer
+        st.session_state.row_snapshot = snapshot
         st.session_state.sheet_version = sheet_version
-        st.session_state.editor_version += 1
-        st.rerun()
+        if conflicts:
+            merged = {c["ID"]: c for c in st.session_state.sync_conflicts + conflicts}
+            st.session_state.sync_conflicts = list(merged.values())
+        if changed:
+            st.session_state.editor_version += 1
 
 # ----------------------------------------------------------------------
 # --- Google Sheet update function ---
 # ----------------------------------------------------------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def update_google_sheet(df, _worksheet_influencers, id_col, cred_col, comment_col):
-    df_to_write = df.copy()
-    df_to_write = normalize_credibility(df_to_write)
+def update_google_sheet(journal, _worksheet_influencers, id_col, cred_col, comment_col):
+    """Queue pending journal entries for write-behind; returns a ticket, or None if nothing is pending."""
+    entries = journal.take_batch()
+    if not entries:
+        return None
+
+    rows = [
+        {id_col: e["id"], comment_col: e["comment"] or "", cred_col: "True" if e["credibility"] else "False"}
+        for e in coalesce(entries)
+    ]
+    return write_queue.submit(
+        _worksheet_influencers, id_col, rows,
+        on_done=lambda: journal.mark_flushed(entries),
+        on_error=lambda: journal.release(entries)
+    )
+
+# --- Group commit once enough edits have accumulated ---
+if journal.due():
+    ticket = update_google_sheet(journal, worksheet_influencers, id_col, cred_col, comment_col)
+    if ticket:
+        st.session_state.sync_tickets.append(ticket)
 
-    df_to_write["Credibility"] = df_to_write["Credibility"].map({True: "True", False: "False"})
+# --- Report finished write-behind flushes back to this session ---
+def on_sync_done(ticket):
+    st.session_state.sheet_updated = True
+    st.cache_data.clear()
+    # The write queue already made edited sheets reload in full
+    invalidate(SHARED_SHEET_KEY, full=False)
 
-    values = [df_to_write.columns.tolist()] + df_to_write.values.tolist()
-    _worksheet_influencers.clear()
-    _worksheet_influencers.update(values)
-    return True
+report_sync_tickets(write_queue, on_sync_done)
 
 # ----------------------------------------------------------------------
 # --- Sidebar ---
@@ -156,187 +256,234 @@ def update_google_sheet(df, _worksheet_influencers, id_col, cred_col, comment_co
 with st.sidebar:
     if st.button("↻ Refresh Data", use_container_width=True):
         st.cache_data.clear()
+        invalidate(SHARED_SHEET_KEY)
         st.session_state.data_loaded = False
         st.rerun()
 
     st.markdown("---")
     st.markdown("### ☁️ Google Sheet Actions")
+    st.caption(f"{len(journal.pending(session_id))} change(s) waiting to sync")
 
     if st.button("🔄 Update Google Sheet", use_container_width=True, type="primary"):
-        try:
-            with st.spinner("↺ Updating Google Sheets..."):
-                success = update_google_sheet(
-                    st.session_state.full_table,
-                    worksheet_influencers,
-                    id_col,
-                    cred_col,
-                    comment_col
-                )
-            if success:
-                st.success("✔️ Google Sheet updated successfully!")
-                st.session_state.sheet_updated = True
-                st.session_state.added_influencers = False
-                st.cache_data.clear()
-        except Exception as e:
-            st.error(f"❌ Failed to update Google Sheet: {e}")
+        ticket = update_google_sheet(journal, worksheet_influencers, id_col, cred_col, comment_col)
+        write_queue.flush_now()
+        if ticket:
+            st.session_state.sync_tickets.append(ticket)
+            st.session_state.added_influencers = False
+            st.success("✔️ Changes queued — Google Sheet will update in the background")
+        elif st.session_state.sync_tickets:
+            st.info("ℹ️ Changes are already being written to Google Sheet")
+        else:
+            st.info("ℹ️ No pending changes to save")
 
 # ----------------------------------------------------------------------
-# --- SECTION 3: Excel-like Bulk Editor ---
+# --- Sync Conflicts ---
 # ----------------------------------------------------------------------
-with st.expander("➕ Paste Single or Multiple Influencers Here", expanded=True):
-    if st.session_state.new_influencers_df is None:
-        st.session_state.new_influencers_df = pd.DataFrame({
-            "ID": [""] * 5,
-            "Comment": [""] * 5,
-            "Credibility": [False] * 5
-        })
-
-    new_editor_df = st.data_editor(
-        st.session_state.new_influencers_df,
-        use_container_width=True,
-        column_config={
-            "ID": st.column_config.TextColumn("ID"),
-            "Comment": st.column_config.TextColumn("Comment"),
-            "Credibility": st.column_config.CheckboxColumn("Credibility (default=❌ Rejected)")
-        },
-        hide_index=True,
-        num_rows="dynamic",
-        key="bulk_add_editor"
+if st.session_state.sync_conflicts:
+    st.warning(
+        f"⚠️ {len(st.session_state.sync_conflicts)} influencer(s) changed in Google Sheet while you had unsaved edits. "
+        "Your values are kept and will overwrite the sheet on the next sync."
     )
+    st.dataframe(pd.DataFrame(st.session_state.sync_conflicts), use_container_width=True, hide_index=True)
+    col_keep, col_sheet = st.columns(2)
+    if col_keep.button("✔️ Keep My Values", use_container_width=True):
+        st.session_state.sync_conflicts = []
+        st.rerun()
+    if col_sheet.button("↺ Use Sheet Values", use_container_width=True):
+        for c in st.session_state.sync_conflicts:
+            label = st.session_state.id_index.get(c["ID"])
+            if label is None or c["Sheet Credibility"] is None:
+                continue
+            table = locate(st.session_state.full_table, st.session_state.added_rows, label)
+            table.at[label, comment_col] = c["Sheet Comment"]
+            table.at[label, "Credibility"] = c["Sheet Credibility"]
+            st.session_state.facets.update(label, c["Sheet Credibility"], c["Sheet Comment"])
+            journal.append("edit", c["ID"], c["Sheet Comment"], c["Sheet Credibility"], session_id)
+        st.session_state.sync_conflicts = []
+        st.session_state.editor_version += 1
+        st.rerun()
 
-    if st.button("💾 Add Influencers to List", type="primary"):
-        new_rows = new_editor_df[new_editor_df["ID"].str.strip() != ""].copy()
-        new_rows = normalize_credibility(new_rows)
-
-        if not new_rows.empty:
-            st.session_state.full_table = pd.concat(
-                [new_rows, st.session_state.full_table],
-                ignore_index=True
-            )
-            st.session_state.added_influencers = True
-            st.success(f"✔️ {len(new_rows)} influencer(s) added locally!")
-            st.warning("⚠️ Don’t forget to click **Update Google Sheet** in the sidebar to save changes permanently!")
-
+# ----------------------------------------------------------------------
+# --- SECTION 3: Excel-like Bulk Editor ---
+# ----------------------------------------------------------------------
+@session_fragment
+def bulk_add_section():
+    with st.expander("➕ Paste Single or Multiple Influencers Here", expanded=True):
+        if st.session_state.new_influencers_df is None:
             st.session_state.new_influencers_df = pd.DataFrame({
                 "ID": [""] * 5,
                 "Comment": [""] * 5,
                 "Credibility": [False] * 5
             })
-            st.session_state.editor_version += 1
-        else:
-            st.warning("⚠️ Please enter at least one influencer ID to add.")
-
-# ----------------------------------------------------------------------
-# --- Scorecards Section (Fixes Your Crash Here)
-# ----------------------------------------------------------------------
-st.session_state.full_table = normalize_credibility(st.session_state.full_table)
 
-st.markdown("<br>", unsafe_allow_html=True)
-st.markdown("---")
+        new_editor_df = st.data_editor(
+            st.session_state.new_influencers_df,
+            use_container_width=True,
+            column_config={
+                "ID": st.column_config.TextColumn("ID"),
+                "Comment": st.column_config.TextColumn("Comment"),
+                "Credibility": st.column_config.CheckboxColumn("Credibility (default=❌ Rejected)")
+            },
+            hide_index=True,
+            num_rows="dynamic",
+            key="bulk_add_editor"
+        )
 
-approved_count = int(st.session_state.full_table["Credibility"].sum())
-rejected_count = int(len(st.session_state.full_table) - approved_count)
+        if st.button("💾 Add Influencers to List", type="primary"):
+            new_rows, duplicates = dedupe_batch(new_editor_df.fillna({"ID": ""}), "ID")
+            new_rows = normalize_credibility(new_rows)
 
-st.markdown(
-    f"""
-    <div style="display: flex; gap: 2rem; align-items: center; margin-bottom: 20px;">
-        <div style="background-color:#eafbea; padding:1rem; border-radius:10px; text-align:center; flex:1;">
-            <h4 style="margin:0;">✔️ Approved</h4>
-            <p style="font-size:1.5rem; margin:0;"><b>{approved_count}</b></p>
-        </div>
-        <div style="background-color:#fdecea; padding:1rem; border-radius:10px; text-align:center; flex:1;">
-            <h4 style="margin:0;">❌ Rejected</h4>
-            <p style="font-size:1.5rem; margin:0;"><b>{rejected_count}</b></p>
-        </div>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+            if not new_rows.empty:
+                # Existing IDs are updated in place; new IDs go to the append buffer
+                buffer, added, updated = upsert_rows(
+                    st.session_state.full_table,
+                    st.session_state.added_rows,
+                    st.session_state.id_index,
+                    st.session_state.facets,
+                    new_rows,
+                    id_col,
+                    comment_col
+                )
+                if needs_compaction(st.session_state.full_table, buffer, st.session_state.facets):
+                    st.session_state.full_table = compact(st.session_state.full_table, buffer, st.session_state.facets)
+                    buffer = None
+                st.session_state.added_rows = buffer
+
+                for op, rows in (("add", added), ("edit", updated)):
+                    for row in rows:
+                        journal.append(op, row[id_col], row.get(comment_col), row["Credibility"], session_id)
+                st.session_state.added_influencers = True
+                st.toast(
+                    f"✔️ {len(added)} influencer(s) added, {len(updated)} already listed and updated locally!"
+                    + (f" {duplicates} duplicate row(s) in the batch were skipped." if duplicates else "")
+                )
+                st.toast("⚠️ Don’t forget to click **Update Google Sheet** in the sidebar to save changes permanently!")
 
-# ----------------------------------------------------------------------
-# --- Filter Influencers ---
-# ----------------------------------------------------------------------
-st.markdown("### 🔍 Change Credibility")
-col1, col2 = st.columns(2)
-cred_labels = {"All": "All", True: "✔️ Approved", False: "❌ Rejected"}
-
-with col1:
-    cred_filter = st.selectbox(
-        "Filter by Credibility",
-        options=["All", True, False],
-        format_func=lambda x: cred_labels[x]
-    )
+                st.session_state.new_influencers_df = pd.DataFrame({
+                    "ID": [""] * 5,
+                    "Comment": [""] * 5,
+                    "Credibility": [False] * 5
+                })
+                st.session_state.editor_version += 1
+                # Scorecards and the main editor live outside this fragment
+                st.rerun()
+            else:
+                st.warning("⚠️ Please enter at least one influencer ID to add.")
 
-with col2:
-    if comment_col in st.session_state.full_table.columns:
-        comment_options = ["All"] + sorted(
-            st.session_state.full_table[comment_col].dropna().unique().tolist()
-        )
-    else:
-        comment_options = ["All"]
-    comment_filter = st.selectbox("Filter by Comment", options=comment_options)
+bulk_add_section()
 
 # ----------------------------------------------------------------------
-# --- Apply filters ---
+# --- Scorecards Section (Fixes Your Crash Here)
 # ----------------------------------------------------------------------
-def get_filtered_table():
-    df = st.session_state.full_table
-    df = normalize_credibility(df)
-
-    mask = pd.Series(True, index=df.index)
+facets = st.session_state.facets
 
-    if cred_filter != "All":
-        mask &= df["Credibility"] == cred_filter
-
-    if comment_filter != "All":
-        mask &= df[comment_col] == comment_filter
+@session_fragment
+def scorecards():
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("---")
 
-    result = df[mask].copy()
-    result["Status"] = result["Credibility"].map({True: "✔️ Approved", False: "❌ Rejected"})
-    return result
+    approved_count = facets.count(True)
+    rejected_count = len(facets) - approved_count
+
+    st.markdown(
+        f"""
+        <div style="display: flex; gap: 2rem; align-items: center; margin-bottom: 20px;">
+            <div style="background-color:#eafbea; padding:1rem; border-radius:10px; text-align:center; flex:1;">
+                <h4 style="margin:0;">✔️ Approved</h4>
+                <p style="font-size:1.5rem; margin:0;"><b>{approved_count}</b></p>
+            </div>
+            <div style="background-color:#fdecea; padding:1rem; border-radius:10px; text-align:center; flex:1;">
+                <h4 style="margin:0;">❌ Rejected</h4>
+                <p style="font-size:1.5rem; margin:0;"><b>{rejected_count}</b></p>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
-filtered_df = get_filtered_table()
-display_df = filtered_df.copy()
+scorecards()
 
 # ----------------------------------------------------------------------
-# --- Edit Influencer Data ---
+# --- Filter Influencers ---
 # ----------------------------------------------------------------------
-editor_key = f"main_editor_v{st.session_state.editor_version}"
-
-if display_df.empty:
-    st.info("ℹ️ No influencers match the current filters")
-else:
-    edited_table = st.data_editor(
-        display_df,
-        use_container_width=True,
-        num_rows="fixed",
-        key=editor_key,
-        hide_index=True
-    )
+@session_fragment
+def editor_section():
+    st.markdown("### 🔍 Change Credibility")
+    col1, col2 = st.columns(2)
+    cred_labels = {"All": "All", True: "✔️ Approved", False: "❌ Rejected"}
+
+    with col1:
+        cred_filter = st.selectbox(
+            "Filter by Credibility",
+            options=["All", True, False],
+            format_func=lambda x: cred_labels[x]
+        )
 
-    if edited_table is not None and not edited_table.empty:
-        updated_full = st.session_state.full_table.copy()
-        updated_full = normalize_credibility(updated_full)
+    with col2:
+        if comment_col in st.session_state.full_table.columns:
+            comment_options = ["All"] + facets.comment_options()
+        else:
+            comment_options = ["All"]
+        comment_filter = st.selectbox("Filter by Comment", options=comment_options)
+
+    # ----------------------------------------------------------------------
+    # --- Apply filters ---
+    # ----------------------------------------------------------------------
+    def get_filtered_table():
+        base, buffer = st.session_state.full_table, st.session_state.added_rows
+
+        # Rows deleted in the sheet stay in the frames as tombstones until compaction
+        if cred_filter == "All" and comment_filter == "All" and not dead_rows(base, buffer, facets):
+            result = select_rows(base, buffer)
+        else:
+            result = select_rows(base, buffer, facets.select(cred_filter, comment_filter))
+        result["Status"] = result["Credibility"].map({True: "✔️ Approved", False: "❌ Rejected"})
+        return result
 
-        changes = []
-        for idx, row in edited_table.iterrows():
-            if idx not in updated_full.index:
-                continue
+    filtered_df = get_filtered_table()
+    display_df = filtered_df.copy()
 
-            if updated_full.at[idx, "Credibility"] != row["Credibility"]:
-                updated_full.at[idx, "Credibility"] = row["Credibility"]
-                changes.append(idx)
+    # ----------------------------------------------------------------------
+    # --- Edit Influencer Data ---
+    # ----------------------------------------------------------------------
+    editor_key = f"main_editor_v{st.session_state.editor_version}"
 
-            if updated_full.at[idx, comment_col] != row[comment_col]:
-                updated_full.at[idx, comment_col] = row[comment_col]
-                changes.append(idx)
+    if display_df.empty:
+        st.info("ℹ️ No influencers match the current filters")
+    else:
+        edited_table = st.data_editor(
+            display_df,
+            use_container_width=True,
+            num_rows="fixed",
+            key=editor_key,
+            hide_index=True
+        )
 
-        if changes:
-            st.session_state.pending_changes = normalize_credibility(updated_full)
+        if edited_table is not None and not edited_table.empty:
+            # Diff only the displayed slice against what was shown
+            def changed(col):
+                before, after = display_df[col], edited_table[col]
+                return ~(before.eq(after) | (before.isna() & after.isna()))
 
-            if st.button("✅ Apply Changes", type="primary"):
-                st.session_state.full_table = st.session_state.pending_changes
-                st.session_state.pending_changes = None
-                st.session_state.editor_version += 1
-                st.success(f"✔️ {len(set(changes))} row(s) updated locally")
-                st.warning("⚠️ Don’t forget to click **Update Google Sheet** in the sidebar to save changes permanently!")
+            changes = edited_table.index[changed("Credibility") | changed(comment_col)]
+
+            if len(changes):
+                st.session_state.pending_changes = normalize_credibility(
+                    edited_table.loc[changes, [id_col, comment_col, "Credibility"]].copy()
+                )
+
+                if st.button("✅ Apply Changes", type="primary"):
+                    for idx, row in st.session_state.pending_changes.iterrows():
+                        table = locate(st.session_state.full_table, st.session_state.added_rows, idx)
+                        table.at[idx, "Credibility"] = row["Credibility"]
+                        table.at[idx, comment_col] = row[comment_col]
+                        facets.update(idx, row["Credibility"], row[comment_col])
+                        journal.append("edit", table.at[idx, id_col], row[comment_col], row["Credibility"], session_id)
+                    st.session_state.pending_changes = None
+                    st.session_state.editor_version += 1
+                    st.toast(f"✔️ {len(changes)} row(s) updated locally")
+                    st.toast("⚠️ Don’t forget to click **Update Google Sheet** in the sidebar to save changes permanently!")
+                    # Refresh the scorecards too
+                    st.rerun()
+
+editor_section()
@@ -1,10 +1,18 @@
 import streamlit as st
 import pandas as pd
-import io
 import re
-import hashlib
-import plotly.express as px
-from utils import get_gsheets_client, get_worksheet_by_key, load_worksheet_df
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from utils import get_gsheets_client, get_worksheets_by_key, load_worksheet_dfs, report_sync_tickets
+from write_queue import get_write_queue
+from upsert import dedupe_batch
+from ingest import upload_digest, parse_uploads, normalize_influencers, save_snapshot, classify, write_export
+from metrics import DEFAULT_WEIGHTS, score, top_k
+from history import HISTORY_COLS, master_version, history_figure, history_aggregates
+from spill import track_session, session_fragment
+from profiling import start_rerun_profile
+from id_codes import add_id_codes, canonical_ids, get_id_dictionary, id_codes
+from shared_cache import POLL_SECONDS, shared_frames, invalidate
 
 # ---------------- Page config ----------------
 st.set_page_config(
@@ -19,25 +27,31 @@ def init_session_state():
     defaults = {
         "data_loaded": False,
         "inf_df": None,
+        "inf_added": {},
         "master_df": None,
         "ws_inf": None,
         "current_file_hash": None,
+        "upload_digests": {},
         "new_df": None,
         "pending_df": None,
         "rejected_df": None,
         "unknown_df": None,
+        "inf_version": 0,
+        "inf_sheet_version": None,
+        "classified_key": None,
+        "sync_tickets": [],
+        "sync_added": {},
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 init_session_state()
 
-# ---------------- Sidebar ----------------
-with st.sidebar:
-    if st.button("↻ Refresh Data", use_container_width=True):
-        st.cache_data.clear()
-        st.session_state.data_loaded = False
-        st.rerun()
+# Opt-in CPU/memory capture of this rerun (see profiling.py)
+start_rerun_profile("list")
+
+# Large frames are accounted per session and spilled to disk while idle
+track_session(["inf_df", "master_df", "new_df", "pending_df", "rejected_df", "unknown_df"])
 
 # ---------------- Helper ----------------
 @st.cache_data
@@ -50,119 +64,126 @@ def format_number(x):
     except:
         return str(x)
 
-# ------------------------------------------
-# Column Name Variations (Flexible Mapping)
-# ------------------------------------------
-COLUMN_ALIASES = {
-    "ID": ["id", "username", "user", "profile", "handle", "account", "instagram", "insta"],
-    "Followers": ["followers", "follower", "subs", "audience", "fans", "total followers"],
-    "Post price": ["post price", "price", "rate", "cost", "fee"],
-    "Avg View": ["avg view", "average views", "views", "impressions", "reach"],
-    "IER": ["ier", "engagement rate", "er", "eng rate", "ier%"],
-    "Avg like": ["avg like", "average likes", "likes", "like"],
-    "Avg comments": ["avg comment", "avg comments", "comments", "comment", "average comments"],
-    "Category": ["category", "niche", "genre", "type"],
-    "CPV": ["cpv", "cost per view"]
-}
-
-
-def map_column_name(col: str):
-    clean = col.lower().strip().replace("_", " ").replace("-", " ")
-
-    # Exact match first
-    for target, aliases in COLUMN_ALIASES.items():
-        if clean in aliases:
-            return target
-
-    # Fallback contains pattern
-    for target, aliases in COLUMN_ALIASES.items():
-        if any(alias in clean for alias in aliases):
-            return target
-
-    return col
-
 # ---------------- Google Sheets ----------------
 SHEET_URL = "https://docs.google.com/spreadsheets/d/1pFpU-ClSWJx2bFEdbZzaH47vedgtI8uxhDVXSKX0ZkE/edit#gid=92547169"
 SHEET_ID = re.search(r"/d/([a-zA-Z0-9-_]+)", SHEET_URL).group(1)
 INF_SHEET = "Influencers List"
 MASTER_SHEET = "Master"
+SHARED_INF_KEY = f"{SHEET_ID}:list-influencers"
+SHARED_MASTER_KEY = f"{SHEET_ID}:list-master"
 
-@st.cache_resource(show_spinner=False)
 def get_sheets_client():
     return get_gsheets_client()
 
+def get_worksheets():
+    # Handles are cached by the client pool for its metadata TTL
+    return get_worksheets_by_key(get_sheets_client(), SHEET_ID, [INF_SHEET, MASTER_SHEET])
+
+# ---------------- Sidebar ----------------
+with st.sidebar:
+    if st.button("↻ Refresh Data", use_container_width=True):
+        st.cache_data.clear()
+        invalidate(SHARED_INF_KEY)
+        invalidate(SHARED_MASTER_KEY)
+        st.session_state.data_loaded = False
+        st.rerun()
+
 # ---------------- Load Influencers (Startup) ----------------
-@st.cache_data(ttl=60, show_spinner="↺ Loading Influencers List...")
-def load_influencers():
-    client = get_sheets_client()
-    ws_inf = get_worksheet_by_key(client, SHEET_ID, INF_SHEET)
-    inf_df = load_worksheet_df(ws_inf)
+def fetch_influencers():
+    # Append-mostly: after the first load only new rows are fetched
+    inf_df = normalize_influencers(load_worksheet_dfs([get_worksheets()[INF_SHEET]], incremental=True)[0])
+
+    # Keep an on-disk copy for headless batch runs (batch.py)
+    try:
+        save_snapshot(inf_df)
+    except Exception:
+        pass
+
+    return [inf_df]
 
-    inf_df["ID"] = inf_df.get("ID", inf_df.columns[0]).astype(str).str.strip()
-    inf_df["Comment"] = inf_df.get("Comment", pd.Series([""] * len(inf_df)))
-    inf_df["Credibility"] = inf_df.get("Credibility", pd.Series(["False"] * len(inf_df)))
-    inf_df["Credibility"] = inf_df["Credibility"].astype(str).str.lower()
+def influencers_version():
+    # Content hash of the sheet; one replica on this host re-reads it per POLL_SECONDS
+    return shared_frames(SHARED_INF_KEY, POLL_SECONDS, fetch_influencers)[0]
 
-    return inf_df, ws_inf
+@st.cache_data(max_entries=2, show_spinner="↺ Loading Google Sheets...")
+def load_influencers_frame(version):
+    # Keyed by content version: edits made elsewhere show up on the next poll
+    return shared_frames(SHARED_INF_KEY, POLL_SECONDS, fetch_influencers)[1][0]
+
+def load_influencers():
+    return load_influencers_frame(influencers_version()), get_worksheets()[INF_SHEET]
 
 # ---------------- Lazy Load Master ----------------
-@st.cache_data(ttl=60, show_spinner="↺ Loading Master Sheet...")
+def fetch_master():
+    master_df = load_worksheet_dfs([get_worksheets()[MASTER_SHEET]], incremental=True)[0]
+    if "ID" in master_df.columns:
+        master_df["ID"] = canonical_ids(master_df["ID"])
+        add_id_codes(master_df)
+    return [master_df]
+
+@st.cache_data(max_entries=2, show_spinner="↺ Loading Master Sheet...")
+def load_master_frame(version):
+    return shared_frames(SHARED_MASTER_KEY, POLL_SECONDS, fetch_master)[1][0]
+
 def load_master_sheet():
-    client = get_sheets_client()
-    ws_master = get_worksheet_by_key(client, SHEET_ID, MASTER_SHEET)
-    master_df = load_worksheet_df(ws_master)
-    return master_df
+    # Only read when history is shown: comparing, or past pricing in the Pending tab
+    return load_master_frame(shared_frames(SHARED_MASTER_KEY, POLL_SECONDS, fetch_master)[0])
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_history_figure(ids, metric, mode, version, _master_df):
+    # Keyed by (IDs, metric, mode, Master version); the frame itself is not hashed
+    return history_figure(_master_df, ids, metric, mode)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_history_aggregates(version, generation, _master_df, _dictionary):
+    # Materialized once per Master version and ID dictionary generation, shared by every session
+    return history_aggregates(_master_df, _dictionary)
+
+# ---------------- Write-Behind Results ----------------
+write_queue = get_write_queue()
+
+def on_sync_done(ticket):
+    st.session_state.sync_added.pop(ticket, None)
+    st.cache_data.clear()
+    # The write queue already made edited sheets reload in full
+    invalidate(SHARED_INF_KEY, full=False)
+    invalidate(SHARED_MASTER_KEY, full=False)
+    st.session_state.data_loaded = False
+
+def on_sync_error(ticket):
+    # Undo the optimistic local classification of rows that never landed
+    added_ids = st.session_state.sync_added.pop(ticket, [])
+    for row_id in added_ids:
+        st.session_state.inf_added.pop(row_id, None)
+    if added_ids:
+        st.session_state.inf_version += 1
+
+report_sync_tickets(write_queue, on_sync_done, on_sync_error)
 
 # ---------------- Initial Load ----------------
-if not st.session_state.data_loaded:
+current_version = influencers_version()
+if not st.session_state.data_loaded or st.session_state.inf_sheet_version != current_version:
+    # Also reloads when the sheets were edited elsewhere; rows added here are kept until they land
+    if not st.session_state.data_loaded:
+        st.session_state.inf_added = {}
     st.session_state.inf_df, st.session_state.ws_inf = load_influencers()
+    st.session_state.master_df = None
+    st.session_state.inf_sheet_version = current_version
+    st.session_state.inf_version += 1
     st.session_state.data_loaded = True
 
 # ---------------- File Upload ----------------
-uploaded_file = st.file_uploader(
-    "Upload Excel/CSV file",
-    type=["xlsx", "xls", "csv"],
-    help="File must contain influencer IDs"
-)
-
-if uploaded_file:
-    file_hash = hashlib.md5(uploaded_file.getvalue()).hexdigest()
-    if st.session_state.current_file_hash != file_hash:
-        st.session_state.current_file_hash = file_hash
-        if uploaded_file.name.endswith(".csv"):
-            new_df = pd.read_csv(uploaded_file)
-        else:
-            new_df = pd.read_excel(uploaded_file)
-
-        # --- Normalize & Map Column Headers ---
-        new_df.columns = [map_column_name(col) for col in new_df.columns]
-
-        # --- Ensure ID exists ---
-        if "ID" not in new_df.columns:
-            new_df.rename(columns={new_df.columns[0]: "ID"}, inplace=True)
-
-        new_df["ID"] = new_df["ID"].astype(str).str.lstrip("@").str.strip()
-
-        # --- Convert numeric columns ---
-        numeric_cols = ["Followers", "Post price", "Avg View", "CPV", "IER", "Avg like", "Avg comments"]
-        for col in numeric_cols:
-            if col in new_df.columns:
-                new_df[col] = pd.to_numeric(new_df[col], errors="coerce")
-
-        st.session_state.new_df = new_df
+@st.cache_resource(show_spinner=False)
+def get_upload_pool():
+    # spawn: never fork the server process with its background threads
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
 
+def classify_uploads():
+    """Split the uploaded candidates into the three tab frames."""
     new_df = st.session_state.new_df
     inf_df = st.session_state.inf_df
 
-    merged_df = new_df.merge(inf_df, on="ID", how="left", suffixes=("", "_sheet"))
-    merged_df["Link"] = "https://www.instagram.com/" + merged_df["ID"]
-
-    rejected_df = merged_df[merged_df["Credibility"] == "false"][["ID", "Comment", "Link"]]
-    unknown_df = merged_df[merged_df["Credibility"].isna()][["ID", "Link"]]
-    pending_ids = set(new_df["ID"]) - set(rejected_df["ID"]) - set(unknown_df["ID"])
-
-    pending_df = new_df[new_df["ID"].isin(pending_ids)].copy()
-    pending_df["Link"] = "https://www.instagram.com/" + pending_df["ID"]
+    pending_df, rejected_df, unknown_df = classify(new_df, inf_df, st.session_state.inf_added)
     pending_df["Select"] = True
     pending_df["Compare"] = False
 
@@ -178,143 +199,214 @@ if uploaded_file:
     st.session_state.rejected_df = rejected_df
     st.session_state.unknown_df = unknown_df
     st.session_state.pending_df = pending_df
+    st.session_state.classified_key = (st.session_state.current_file_hash, st.session_state.inf_version)
+
+@session_fragment
+def upload_stage():
+    uploaded_files = st.file_uploader(
+        "Upload Excel/CSV files",
+        type=["xlsx", "xls", "csv"],
+        accept_multiple_files=True,
+        help="Files must contain influencer IDs"
+    )
+
+    if not uploaded_files:
+        st.session_state.upload_digests = {}
+        if st.session_state.new_df is not None:
+            st.session_state.new_df = None
+            st.session_state.current_file_hash = None
+            st.rerun()
+        return
+
+    # Hash each uploaded file once, keyed by its upload ID
+    digests = {
+        f.file_id: st.session_state.upload_digests.get(f.file_id) or upload_digest(f.getbuffer())
+        for f in uploaded_files
+    }
+    st.session_state.upload_digests = digests
+
+    file_hash = "-".join(digests[f.file_id] for f in uploaded_files)
+    if st.session_state.current_file_hash != file_hash:
+        st.session_state.current_file_hash = file_hash
+        with st.spinner(f"↺ Processing {len(uploaded_files)} file(s)..."):
+            try:
+                st.session_state.new_df = parse_uploads(
+                    [(f.name, f.getbuffer()) for f in uploaded_files],
+                    get_upload_pool(),
+                    [digests[f.file_id] for f in uploaded_files]
+                )
+            except ValueError as e:
+                st.session_state.current_file_hash = None
+                st.error(f"❌ Could not read uploaded files: {e}")
+                return
+        # The tabs live outside this fragment
+        st.rerun()
+
+upload_stage()
+
+# ---------------- Pending Tab ----------------
+@session_fragment
+def shortlist_panel(pending_df):
+    with st.expander("🏆 Shortlist Top Candidates"):
+        weight_cols = st.columns(len(DEFAULT_WEIGHTS) + 1)
+        weights = {
+            metric: weight_cols[i].number_input(metric, value=default, step=0.25, key=f"weight_{metric}")
+            for i, (metric, default) in enumerate(DEFAULT_WEIGHTS.items())
+        }
+        k = weight_cols[-1].number_input("Top k", min_value=1, value=min(20, max(len(pending_df), 1)), step=1)
+        shortlist = top_k(pending_df, score(pending_df, weights), int(k))
+        st.dataframe(
+            shortlist[["ID", "Link", "Score", "Followers", "Post price", "Avg View", "IER", "CPV", "Cost per follower"]],
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Link": st.column_config.LinkColumn("Instagram", display_text="View Profile")}
+        )
+
+@session_fragment
+def compare_panel(compare_ids):
+    # -------- Lazy Load Master Sheet Safely --------
+    if st.session_state.master_df is None:
+        st.session_state.master_df = load_master_sheet()
+    master_df = st.session_state.master_df
+
+    st.markdown("### 📈 Compare History")
+    col_metric, col_mode = st.columns(2)
+    y_axis_choice = col_metric.selectbox("Select Y-axis", options=["Post Price", "Follower"], key="compare_metric")
+    chart_mode = col_mode.radio("Chart mode", ["Combined", "Small multiples"], horizontal=True, key="compare_mode")
+
+    fig, found = build_history_figure(compare_ids, y_axis_choice, chart_mode, master_version(master_df), master_df)
+
+    missing = [i for i in compare_ids if i not in found]
+    if missing:
+        st.warning(f"No historical data found for {', '.join(missing)}")
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+@session_fragment
+def export_panel(selected):
+    st.markdown("### 📥 Export Selected Influencers")
+    # Rebuild the workbook only when the selection itself changes
+    export_key = tuple(selected["ID"])
+    if st.session_state.get("export_key") != export_key:
+        st.session_state.export_file = write_export(selected).getvalue()
+        st.session_state.export_key = export_key
+
+    st.download_button(
+        "📥 Download Excel",
+        st.session_state.export_file,
+        "selected_influencers.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        use_container_width=True
+    )
+
+def with_history(pending_df):
+    """Past pricing from Master joined onto the Pending rows in one lookup."""
+    if st.session_state.master_df is None:
+        st.session_state.master_df = load_master_sheet()
+    ids = get_id_dictionary()
+    aggregates = load_history_aggregates(
+        master_version(st.session_state.master_df), ids.generation, st.session_state.master_df, ids
+    )
+    codes = pd.Series(id_codes(pending_df, dictionary=ids), index=pending_df.index)
+    return pending_df.join(aggregates.reindex(codes).set_axis(pending_df.index))
+
+@session_fragment
+def pending_tab():
+    pending_df = st.session_state.pending_df
+    show_history = st.toggle("📈 Past pricing from Master", key="show_history")
+    pending_display = with_history(pending_df) if show_history else pending_df.copy()
+    for col in ["Followers", "Post price", "Avg View", "CPV", "Cost per follower", "IER", "Avg like", "Avg comments"] + [c for c in HISTORY_COLS if c != "Last Campaign"]:
+        if col in pending_display.columns:
+            pending_display[col] = pending_display[col].apply(format_number)
+
+    display_cols = ["ID", "Source file", "Link", "Followers", "Category", "Post price", "IER", "Avg like", "Avg comments", "Avg View", "CPV", "Cost per follower"] + (HISTORY_COLS if show_history else []) + ["Select", "Compare"]
+    pending_edited = st.data_editor(
+        pending_display[display_cols],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Select": st.column_config.CheckboxColumn("Include in Export", default=True),
+            "Compare": st.column_config.CheckboxColumn("Compare History", default=False),
+            "Link": st.column_config.LinkColumn("Instagram", display_text="View Profile")
+        },
+        key="pending_editor"
+    )
+
+    shortlist_panel(pending_df)
+
+    compare_df = pending_edited[pending_edited["Compare"]]
+    if not compare_df.empty:
+        compare_panel(tuple(sorted(compare_df["ID"].astype(str))))
+
+    # -------- Export 20-column Excel --------
+    selected = pending_edited[pending_edited["Select"]]
+    if not selected.empty:
+        export_panel(selected)
+
+# ---------------- Rejected Tab ----------------
+@session_fragment
+def rejected_tab():
+    st.dataframe(st.session_state.rejected_df, use_container_width=True, hide_index=True,
+        column_config={"Link": st.column_config.LinkColumn("Instagram", display_text="View Profile")})
+
+# ---------------- Unknown Tab ----------------
+@session_fragment
+def unknown_tab():
+    unknown_edited = st.data_editor(
+        st.session_state.unknown_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Status": st.column_config.SelectboxColumn("Status", options=["Approved", "Rejected"]),
+            "Select_Sheet": st.column_config.CheckboxColumn("Add to Sheet"),
+            "Link": st.column_config.LinkColumn("Instagram", display_text="View Profile"),
+            "Comment": st.column_config.TextColumn("Comment")
+        },
+        key="unknown_editor"
+    )
+    if st.button("☁️ Add Selected to Google Sheet", type="primary", use_container_width=True):
+        to_add, _ = dedupe_batch(unknown_edited[unknown_edited["Select_Sheet"]], "ID")
+        ids = get_id_dictionary()
+        known = set(id_codes(st.session_state.inf_df, dictionary=ids)) | set(ids.encode(list(st.session_state.inf_added)))
+        to_add = to_add[~pd.Series(ids.encode(to_add["ID"]), index=to_add.index).isin(known)]
+        if not to_add.empty:
+            to_add["Credibility"] = to_add["Status"].map({"Approved": "True", "Rejected": "False"})
+            to_add = to_add[["ID", "Comment", "Credibility"]]
+            ticket = write_queue.submit(st.session_state.ws_inf, "ID", to_add.to_dict("records"))
+            st.session_state.sync_tickets.append(ticket)
+            st.session_state.sync_added[ticket] = list(to_add["ID"])
+
+            # Classify the new IDs locally right away; the sheet catches up in the background
+            for row in to_add.to_dict("records"):
+                st.session_state.inf_added[row["ID"]] = {"Comment": row["Comment"], "Credibility": row["Credibility"].lower()}
+            st.session_state.inf_version += 1
+            st.toast(f"✔️ {len(to_add)} influencer(s) queued for Google Sheet!")
+            st.rerun()
+
+# ---------------- Results ----------------
+if st.session_state.new_df is not None:
+    if st.session_state.classified_key != (st.session_state.current_file_hash, st.session_state.inf_version):
+        classify_uploads()
 
     # ---------------- Title ----------------
     st.markdown("## 🔍 Analyzing Influencers Credibility")
+    recovered = st.session_state.new_df.attrs.get("recovered")
+    if recovered:
+        st.caption("🔢 Parsed humanized values (K/M, separators, currency, %): " + ", ".join(f"{col} {n:,}" for col, n in recovered.items()))
 
     # ---------------- Tabs ----------------
     tabs = st.tabs([
-        f"🕒 Pending ({len(pending_df)})",
-        f"❌ Rejected ({len(rejected_df)})",
-        f"❓ Unknown ({len(unknown_df)})"
+        f"🕒 Pending ({len(st.session_state.pending_df)})",
+        f"❌ Rejected ({len(st.session_state.rejected_df)})",
+        f"❓ Unknown ({len(st.session_state.unknown_df)})"
     ])
 
-    # ---------------- Pending Tab ----------------
     with tabs[0]:
-        pending_display = pending_df.copy()
-        for col in ["Followers", "Post price", "Avg View", "CPV", "IER", "Avg like", "Avg comments"]:
-            if col in pending_display.columns:
-                pending_display[col] = pending_display[col].apply(format_number)
-
-        display_cols = ["ID", "Link", "Followers", "Category", "Post price", "IER", "Avg like", "Avg comments", "Avg View", "CPV", "Select", "Compare"]
-        pending_edited = st.data_editor(
-            pending_display[display_cols],
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Select": st.column_config.CheckboxColumn("Include in Export", default=True),
-                "Compare": st.column_config.CheckboxColumn("Compare History", default=False),
-                "Link": st.column_config.LinkColumn("Instagram", display_text="View Profile")
-            },
-            key="pending_editor"
-        )
-
-        # -------- Lazy Load Master Sheet Safely --------
-        compare_df = pending_edited[pending_edited["Compare"]]
-        if not compare_df.empty:
-            if st.session_state.master_df is None:
-                st.session_state.master_df = load_master_sheet()
-            master_df = st.session_state.master_df
-
-            st.markdown("### 📈 Compare History")
-            for influencer_id in compare_df["ID"]:
-                if master_df is not None and "ID" in master_df.columns:
-                    influencer_history = master_df[master_df["ID"].astype(str) == str(influencer_id)].dropna(subset=["Publication Date (Gregorian)"])
-                else:
-                    st.warning(f"Master sheet data not available for {influencer_id}")
-                    continue
-
-                if influencer_history.empty:
-                    st.warning(f"No historical data found for {influencer_id}")
-                    continue
-
-                influencer_history = influencer_history.sort_values(by="Publication Date (Gregorian)")
-                influencer_history["Publication Date (Gregorian)"] = pd.to_datetime(influencer_history["Publication Date (Gregorian)"]).dt.strftime("%Y-%m-%d")
-
-                y_axis_choice = st.selectbox(
-                    f"Select Y-axis",
-                    options=["Post Price", "Follower"],
-                    key=f"y_axis_{influencer_id}"
-                )
-
-                fig = px.line(
-                    influencer_history,
-                    x="Campaign name",
-                    y=y_axis_choice,
-                    markers=True,
-                    title=f"📊 {influencer_id} - {y_axis_choice} Over Time",
-                    hover_data={"Publication Date (Gregorian)": True, y_axis_choice: True, "Campaign name": True}
-                )
-                fig.update_layout(xaxis_title="Campaign Name", yaxis_title=y_axis_choice)
-                st.plotly_chart(fig, use_container_width=True)
-
-        # -------- Export 20-column Excel --------
-        selected = pending_edited[pending_edited["Select"]]
-        if not selected.empty:
-            st.markdown("### 📥 Export Selected Influencers")
-            export_df = pd.DataFrame(columns=[f"col{i}" for i in range(1, 21)])
-            export_df["col6"] = selected["ID"]
-            export_df["col12"] = selected["Link"]
-            export_df["col13"] = selected.get("Category", "")
-            export_df["col15"] = selected.get("Followers", "")
-            export_df["col16"] = selected.get("IER", "")
-            export_df["col17"] = selected.get("Avg like", "")
-            export_df["col18"] = selected.get("Avg comments", "")
-            export_df["col20"] = selected.get("Post price", "")
-
-            col_names = [
-                "", "", "", "", "", "ID", "", "", "", "",
-                "", "Link", "Category", "", "Follower", "IER", "Avg Like", "Avg Comment", "", "Post Price"
-            ]
-            export_df.columns = col_names
-
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                export_df.to_excel(writer, index=False, sheet_name="Selected")
-            output.seek(0)
-
-            st.download_button(
-                "📥 Download Excel",
-                output,
-                "selected_influencers.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
-
-    # ---------------- Rejected Tab ----------------
+        pending_tab()
     with tabs[1]:
-        st.dataframe(rejected_df, use_container_width=True, hide_index=True,
-            column_config={"Link": st.column_config.LinkColumn("Instagram", display_text="View Profile")})
-
-    # ---------------- Unknown Tab ----------------
+        rejected_tab()
     with tabs[2]:
-        unknown_edited = st.data_editor(
-            unknown_df,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Status": st.column_config.SelectboxColumn("Status", options=["Approved", "Rejected"]),
-                "Select_Sheet": st.column_config.CheckboxColumn("Add to Sheet"),
-                "Link": st.column_config.LinkColumn("Instagram", display_text="View Profile"),
-                "Comment": st.column_config.TextColumn("Comment")
-            },
-            key="unknown_editor"
-        )
-        if st.button("☁️ Add Selected to Google Sheet", type="primary", use_container_width=True):
-            to_add = unknown_edited[unknown_edited["Select_Sheet"]]
-            if not to_add.empty:
-                to_add["Credibility"] = to_add["Status"].map({"Approved": "True", "Rejected": "False"})
-                try:
-                    st.session_state.ws_inf.append_rows(
-                        to_add[["ID", "Comment", "Credibility"]].values.tolist(),
-                        value_input_option="USER_ENTERED"
-                    )
-                    st.success(f"✔️ {len(to_add)} influencer(s) added successfully!")
-                    st.cache_data.clear()
-                    st.session_state.data_loaded = False
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Failed to update Google Sheet: {e}")
+        unknown_tab()
 
 else:
     st.markdown("<h3 style='text-align:center'>👋 Upload a file to start</h3>", unsafe_allow_html=True)
@@ -0,0 +1,91 @@
+"""
+Bulk normalization for Persian-language data: Persian/Arabic-Indic digits to
+ASCII, and Jalali (Solar Hijri) dates to Gregorian, one whole column at a time.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# ---------------- Digits ----------------
+DIGITS = str.maketrans(
+    "۰۱۲۳۴۵۶۷۸۹" "٠١٢٣٤٥٦٧٨٩" "٫٬",
+    "0123456789" "0123456789" ".,",
+)
+_NON_ASCII_DIGIT = re.compile("[۰-۹٠-٩٫٬]")
+
+
+def _text_columns(df):
+    return [c for c in df.columns if df[c].dtype == object or isinstance(df[c].dtype, pd.StringDtype)]
+
+
+def normalize_digits(df):
+    """Translate Persian and Arabic-Indic digits to ASCII in every text column, in place."""
+    for col in _text_columns(df):
+        text = df[col].astype("string")
+        if text.str.contains(_NON_ASCII_DIGIT, na=False).any():
+            df[col] = df[col].where(df[col].isna(), text.str.translate(DIGITS))
+    return df
+
+
+# ---------------- Jalali Dates ----------------
+_JALALI_DATE = r"^\s*(?P<y>1[2-5]\d\d)\s*[/\-.]\s*(?P<m>\d{1,2})\s*[/\-.]\s*(?P<d>\d{1,2})"
+# 1 Farvardin 1403 fell on 20 March 2024
+_EPOCH_JALALI = (1403, 1, 1)
+_EPOCH_GREGORIAN = np.datetime64("2024-03-20", "D")
+
+
+def _jalali_day_number(y, m, d):
+    """Day count of Jalali dates (33-year arithmetic calendar), for int arrays."""
+    y = y + 1595
+    return (-355668 + 365 * y + (y // 33) * 8 + ((y % 33) + 3) // 4 + d
+            + np.where(m < 7, (m - 1) * 31, (m - 7) * 30 + 186))
+
+
+def jalali_to_gregorian(year, month, day):
+    """datetime64[D] array for integer arrays of Jalali year, month and day."""
+    y, m, d = (np.asarray(a, dtype=np.int64) for a in (year, month, day))
+    offset = _jalali_day_number(y, m, d) - _jalali_day_number(*(np.int64(v) for v in _EPOCH_JALALI))
+    return _EPOCH_GREGORIAN + offset.astype("timedelta64[D]")
+
+
+def parse_jalali(series):
+    """Gregorian datetimes for a column of Jalali date strings ("1402/05/17"); NaT where invalid."""
+    parts = series.astype("string").str.translate(DIGITS).str.extract(_JALALI_DATE)
+    ymd = parts.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    y, m, d = ymd[:, 0], ymd[:, 1], ymd[:, 2]
+    valid = ~np.isnan(ymd).any(axis=1)
+    valid &= (m >= 1) & (m <= 12) & (d >= 1) & (d <= np.where(m <= 6, 31, 30))
+    # 30 Esfand only exists in leap years
+    esfand_30 = valid & (m == 12) & (d == 30)
+    if esfand_30.any():
+        yy = y[esfand_30].astype(np.int64)
+        leap = _jalali_day_number(yy + 1, 1, 1) - _jalali_day_number(yy, 12, 1) == 30
+        valid[np.flatnonzero(esfand_30)[~leap]] = False
+
+    out = np.full(len(series), np.datetime64("NaT"), dtype="datetime64[D]")
+    if valid.any():
+        out[valid] = jalali_to_gregorian(y[valid], m[valid], d[valid])
+    return pd.Series(out, index=series.index, dtype="datetime64[s]")
+
+
+def jalali_columns(df, threshold=0.8):
+    """Text columns whose non-empty values are mostly Jalali dates (sampled)."""
+    found = []
+    for col in _text_columns(df):
+        if "gregorian" in str(col).lower():
+            continue
+        sample = df[col].dropna().astype("string").str.strip()
+        sample = sample[sample != ""].head(200)
+        if not sample.empty and sample.str.translate(DIGITS).str.match(_JALALI_DATE).mean() >= threshold:
+            found.append(col)
+    return found
+
+
+def add_gregorian_dates(df):
+    """For each Jalali date column, add "<column> (Gregorian)" unless the sheet already has it."""
+    for col in jalali_columns(df):
+        target = f"{col} (Gregorian)"
+        if target not in df.columns:
+            df[target] = parse_jalali(df[col])
+    return df
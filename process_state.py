@@ -0,0 +1,48 @@
+"""
+Process-wide shared objects.
+
+Streamlit serves every browser session from threads of one server process.
+Objects that coordinate across sessions (the Sheets client pool, the
+write-behind queue, the interned ID dictionary) must therefore exist once per
+process rather than once per session: one pool of connections, one queue that
+coalesces every session's writes, one ID -> code mapping so codes from
+different sessions' frames are comparable. The pool and the queue are
+created lazily, under a lock, by getters decorated with process_singleton.
+The ID dictionary keeps its own global and lock in id_codes, because
+get_id_dictionary replaces it with a new generation once it is full. The
+objects themselves are thread-safe.
+"""
+import functools
+import os
+import threading
+
+
+def process_singleton(factory):
+    """Make `factory` return one shared instance, created by the first call (with its arguments)."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def getter(*args, **kwargs):
+        with lock:
+            if not instance:
+                instance.append(factory(*args, **kwargs))
+            return instance[0]
+    return getter
+
+
+def process_alive(pid):
+    """
+    Whether a process with this PID is running on this host. Only answers on
+    POSIX (os.kill(pid, 0) would terminate the process on Windows); elsewhere
+    every process is assumed alive.
+    """
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
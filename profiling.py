@@ -0,0 +1,190 @@
+"""
+Opt-in per-rerun profiling.
+
+Enable it for every rerun with INFLUENCER_PROFILE=1, or for one browser tab
+with ?profile=<INFLUENCER_PROFILE_TOKEN>. Each profiled page rerun writes to
+INFLUENCER_PROFILE_DIR (default .cache/profiles):
+
+- <time>-<n>-<page>-<trigger>.folded: sampled stacks in collapsed format,
+  ready for flamegraph.pl or speedscope;
+- <time>-<n>-<page>-<trigger>.alloc.txt: wall time, peak traced memory and
+  the allocation sites that grew most between the start and the end of the
+  rerun (a tracemalloc snapshot diff).
+
+<n> is a per-process counter so reruns within the same second do not collide.
+Fragment reruns are profiled as <page>-<fragment>. <trigger> names the keyed
+widgets whose values changed since the previous rerun ("rerun" when none did,
+e.g. for buttons without keys).
+"""
+import collections
+import functools
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+import streamlit as st
+
+# ---------------- Settings ----------------
+PROFILE_DIR = os.environ.get("INFLUENCER_PROFILE_DIR", os.path.join(".cache", "profiles"))
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TOP_ALLOCATIONS = 25
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+_file_counter = itertools.count(1)
+_active = {}  # script thread ident -> RerunProfile sampling it
+_active_lock = threading.Lock()
+
+
+def profiling_enabled():
+    if os.environ.get("INFLUENCER_PROFILE") == "1":
+        return True
+    token = os.environ.get("INFLUENCER_PROFILE_TOKEN")
+    return bool(token) and st.query_params.get("profile") == token
+
+
+# ---------------- Trigger Label ----------------
+_SIMPLE = (str, int, float, bool, type(None))
+
+def _trigger():
+    """Keyed widget values that changed since this session's previous rerun."""
+    current = {
+        k: v for k, v in st.session_state.items()
+        if isinstance(v, _SIMPLE) and not str(k).startswith("_")
+    }
+    previous = st.session_state.get("_profile_widgets", {})
+    st.session_state["_profile_widgets"] = current
+    changed = sorted(str(k) for k, v in current.items() if k in previous and previous[k] != v)
+    return "+".join(changed) or "rerun"
+
+
+# ---------------- Tracemalloc ----------------
+def _start_tracing():
+    global _trace_users
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _trace_users += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracing():
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0:
+            tracemalloc.stop()
+
+
+# ---------------- Sampler ----------------
+class RerunProfile(threading.Thread):
+    """
+    Samples the script thread's stack until the page file is no longer on it,
+    which is how a rerun ends whether it finishes, stops or reruns. Without a
+    page file (fragments) it samples until finish() is called.
+    """
+
+    def __init__(self, page, page_file, trigger):
+        super().__init__(name=f"profile-{page}", daemon=True)
+        self.page, self.page_file, self.trigger = page, page_file, trigger
+        self.target = threading.get_ident()
+        self.stacks = collections.Counter()
+        self.finished = threading.Event()
+        # Baseline for the allocation diff; tracing has already started
+        self.baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.target)
+        labels, in_page = [], self.page_file is None
+        while frame is not None:
+            in_page = in_page or frame.f_code.co_filename == self.page_file
+            labels.append(self._label(frame))
+            frame = frame.f_back
+        if in_page and labels:
+            self.stacks[";".join(reversed(labels))] += 1
+        return in_page
+
+    def finish(self):
+        self.finished.set()
+        self._release()
+
+    def _release(self):
+        with _active_lock:
+            if _active.get(self.target) is self:
+                del _active[self.target]
+
+    def run(self):
+        try:
+            while not self.finished.is_set() and self._sample():
+                time.sleep(SAMPLE_INTERVAL)
+            # The next rerun may start while this one is written out
+            self._release()
+            self._write(time.perf_counter() - self.started)
+        finally:
+            self._release()
+            _stop_tracing()
+
+    def _write(self, elapsed):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        trigger = re.sub(r"[^A-Za-z0-9_.+-]", "_", self.trigger)[:80]
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_file_counter)}"
+        base = os.path.join(PROFILE_DIR, f"{stamp}-{self.page}-{trigger}")
+
+        with open(f"{base}.folded", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        with open(f"{base}.alloc.txt", "w") as f:
+            f.write(f"page: {self.page}\ntrigger: {self.trigger}\n")
+            f.write(f"wall time: {elapsed:.3f}s\npeak traced memory: {peak / 1e6:.1f} MB\n")
+            # Tracing is process-wide: concurrent reruns show up in the diff too
+            f.write("allocation growth during the rerun:\n\n")
+            for stat in snapshot.compare_to(self.baseline, "lineno")[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+
+def _start(page, page_file):
+    if not profiling_enabled():
+        return None
+    target = threading.get_ident()
+    with _active_lock:
+        if target in _active:
+            # Already profiled, e.g. a fragment running inside a full rerun
+            return None
+        _start_tracing()
+        profile = _active[target] = RerunProfile(page, page_file, _trigger())
+    profile.start()
+    return profile
+
+
+def start_rerun_profile(page):
+    """Profile the calling page's rerun if profiling is enabled. Call at the top of the page."""
+    return _start(page, sys._getframe(1).f_code.co_filename)
+
+
+def profile_fragment(func):
+    """Profile each fragment-only rerun of `func` as "<page>-<function>"."""
+    page = os.path.splitext(os.path.basename(func.__code__.co_filename))[0].lower()
+    label = f"{page}-{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _start(label, None)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.finish()
+    return wrapper
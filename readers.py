@@ -0,0 +1,112 @@
+"""
+Spreadsheet reader engines for uploads.
+
+Run `python readers.py FILE [FILE ...]` to benchmark every available engine
+on sample files.
+"""
+import argparse
+import importlib.util
+import io
+import os
+import time
+
+import pandas as pd
+
+# ---------------- Engines ----------------
+def _read_excel_calamine(data):
+    return pd.read_excel(io.BytesIO(data), engine="calamine")
+
+def _read_excel_openpyxl(data):
+    return pd.read_excel(io.BytesIO(data), engine="openpyxl", engine_kwargs={"read_only": True, "data_only": True})
+
+def _read_excel_xlrd(data):
+    return pd.read_excel(io.BytesIO(data), engine="xlrd")
+
+def _read_csv_pyarrow(data):
+    return pd.read_csv(io.BytesIO(data), engine="pyarrow")
+
+def _read_csv_c(data):
+    return pd.read_csv(io.BytesIO(data))
+
+
+# Fastest first; each entry is (name, required module, reader)
+ENGINES = {
+    ".xlsx": [
+        ("calamine", "python_calamine", _read_excel_calamine),
+        ("openpyxl", "openpyxl", _read_excel_openpyxl),
+    ],
+    ".xls": [
+        ("calamine", "python_calamine", _read_excel_calamine),
+        ("xlrd", "xlrd", _read_excel_xlrd),
+    ],
+    ".csv": [
+        ("pyarrow", "pyarrow", _read_csv_pyarrow),
+        ("c", None, _read_csv_c),
+    ],
+}
+
+
+def available_engines(ext):
+    """Installed engines for a file extension, fastest first; none for unknown extensions."""
+    return [
+        (name, reader) for name, module, reader in ENGINES.get(ext, [])
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def read_table(name, data, engine=None):
+    """
+    Read uploaded bytes with the fastest installed engine, or with `engine`
+    if given. Falls back to the next engine if a fast one rejects the file.
+    """
+    ext = os.path.splitext(name.lower())[1]
+    if ext not in ENGINES:
+        raise ValueError(f"Unsupported file type '{ext or name}'")
+    engines = available_engines(ext)
+    if not engines:
+        raise ValueError(f"No reader available for {ext} files")
+    if engine is not None:
+        engines = [e for e in engines if e[0] == engine]
+        if not engines:
+            raise ValueError(f"Reader engine '{engine}' is not available for {ext} files")
+
+    for i, (_, reader) in enumerate(engines):
+        try:
+            return reader(data)
+        except Exception:
+            if i == len(engines) - 1:
+                raise
+
+
+# ---------------- Benchmark ----------------
+def benchmark(paths, repeat=3):
+    """Best-of-`repeat` parse throughput per engine, as (file, engine, MB/s, rows) rows."""
+    results = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        size_mb = len(data) / 1e6
+        for name, reader in available_engines(os.path.splitext(path.lower())[1]):
+            best, rows = None, 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = len(reader(data))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results.append((os.path.basename(path), name, size_mb / best if best else float("inf"), rows))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spreadsheet reader engines on sample files.")
+    parser.add_argument("files", nargs="+", help="sample .xlsx/.xls/.csv files")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per engine (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'file':<32} {'engine':<10} {'MB/s':>10} {'rows':>10}")
+    for file, engine, throughput, rows in benchmark(args.files, args.repeat):
+        print(f"{file:<32} {engine:<10} {throughput:>10.2f} {rows:>10}")
+
+
+if __name__ == "__main__":
+    main()
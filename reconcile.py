@@ -0,0 +1,118 @@
+import pandas as pd
+
+from id_codes import GENERATION, get_id_dictionary
+from upsert import locate, upsert_rows
+
+# ---------------- Row Hashes ----------------
+def row_snapshot(df, id_col, cols):
+    """
+    Content hash and row position per ID for one sheet snapshot.
+    Returns a DataFrame indexed by interned ID code with "ID", "hash" and "pos"
+    columns; when an ID appears more than once the last occurrence wins, as it
+    does on write.
+    """
+    dictionary = get_id_dictionary()
+    ids = df[id_col].to_numpy()
+    snapshot = pd.DataFrame({
+        "ID": ids,
+        "hash": pd.util.hash_pandas_object(df[cols].astype(str), index=False).values,
+        "pos": range(len(df)),
+    }, index=dictionary.encode(ids))
+    snapshot = snapshot[~snapshot.index.duplicated(keep="last")]
+    snapshot.attrs[GENERATION] = dictionary.generation
+    return snapshot
+
+
+def in_generation(snapshot, dictionary):
+    """The snapshot indexed by codes of `dictionary`, re-encoded if it is from an older generation."""
+    if snapshot.attrs.get(GENERATION) == dictionary.generation:
+        return snapshot
+    snapshot = snapshot.set_axis(dictionary.encode(snapshot["ID"].to_numpy()))
+    snapshot.attrs[GENERATION] = dictionary.generation
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """
+    Exact remote inserts, updates and deletes (lists of IDs) between two
+    snapshots. Set operations run on integer codes; only changed IDs are looked up.
+    """
+    dictionary = get_id_dictionary()
+    old, new = in_generation(old, dictionary), in_generation(new, dictionary)
+    inserts = new.index.difference(old.index)
+    deletes = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+    updates = common[new.loc[common, "hash"].values != old.loc[common, "hash"].values]
+    return (new.loc[inserts, "ID"].tolist(), new.loc[updates, "ID"].tolist(),
+            old.loc[deletes, "ID"].tolist())
+
+
+# ---------------- Reconciler ----------------
+def reconcile(base, buffer, id_index, facets, remote_df, snapshot, diff, local_ids,
+              id_col, comment_col, cred_col="Credibility"):
+    """
+    Apply remote changes to the session table in O(changed rows), without
+    copying it: updates are written in place, inserts go to the append buffer
+    (as upsert_rows does) and deleted rows are left as tombstones, dropped
+    from `id_index` and `facets` until the table is compacted.
+    Rows with unsynced local edits (`local_ids`) keep their local values; where
+    the sheet now disagrees they are returned as conflicts instead.
+    Returns (buffer, number of rows changed, conflicts).
+    """
+    inserts, updates, deletes = diff
+    dictionary = get_id_dictionary()
+    snapshot = in_generation(snapshot, dictionary)
+    code = dictionary.code
+    conflicts, new_rows = [], []
+    changed = 0
+
+    for row_id in updates + inserts:
+        remote = remote_df.iloc[snapshot.at[code(row_id), "pos"]]
+        comment, cred = remote[comment_col], bool(remote[cred_col])
+        label = id_index.get(row_id)
+
+        if label is None:
+            new_rows.append({id_col: row_id, comment_col: comment, cred_col: cred})
+            continue
+        table = locate(base, buffer, label)
+        if table.at[label, comment_col] == comment and bool(table.at[label, cred_col]) == cred:
+            continue
+        if row_id in local_ids:
+            conflicts.append({
+                "ID": row_id,
+                "Your Comment": table.at[label, comment_col],
+                "Your Credibility": bool(table.at[label, cred_col]),
+                "Sheet Comment": comment,
+                "Sheet Credibility": cred,
+            })
+            continue
+
+        table.at[label, comment_col] = comment
+        table.at[label, cred_col] = cred
+        facets.update(label, cred, comment)
+        changed += 1
+
+    for row_id in deletes:
+        label = id_index.get(row_id)
+        if label is None:
+            continue
+        if row_id in local_ids:
+            table = locate(base, buffer, label)
+            conflicts.append({
+                "ID": row_id,
+                "Your Comment": table.at[label, comment_col],
+                "Your Credibility": bool(table.at[label, cred_col]),
+                "Sheet Comment": None,
+                "Sheet Credibility": None,
+            })
+            continue
+        del id_index[row_id]
+        facets.remove(label)
+        changed += 1
+
+    if new_rows:
+        buffer, added, _ = upsert_rows(base, buffer, id_index, facets, pd.DataFrame(new_rows),
+                                       id_col, comment_col, cred_col)
+        changed += len(added)
+
+    return buffer, changed, conflicts
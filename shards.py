@@ -0,0 +1,120 @@
+"""
+Sharded storage for the influencer list.
+
+With INFLUENCER_SHARDS=N (N > 1) the rows of "Influencers List" live in N
+worksheets of the same spreadsheet, "Influencers List 1/N" ... "N/N", and each
+ID belongs to the shard picked by its hash. A ShardedTable stands in for the
+worksheet: reads fan out to every shard in parallel and come back as one
+table (sheets_io), and the write-behind queue writes each row to its owning
+shard only.
+
+Move an existing list into shards with:
+
+    python shards.py --credentials sa.json --shards 4
+"""
+import argparse
+import os
+import sys
+import zlib
+
+from id_codes import canonical_id
+
+# ---------------- Settings ----------------
+SHARD_COUNT = int(os.environ.get("INFLUENCER_SHARDS", "1"))
+SHARDED_TABLES = {"Influencers List"}
+DEFAULT_SHEET_ID = "1pFpU-ClSWJx2bFEdbZzaH47vedgtI8uxhDVXSKX0ZkE"
+
+
+def shard_names(name, count=SHARD_COUNT):
+    if count <= 1:
+        return [name]
+    return [f"{name} {i + 1}/{count}" for i in range(count)]
+
+
+def shard_index(row_id, count=SHARD_COUNT):
+    """Owning shard of an ID; stable across processes and Python versions."""
+    return zlib.crc32(canonical_id(row_id).encode()) % count
+
+
+# ---------------- Logical Table ----------------
+class ShardedTable:
+    """Several worksheets with the same header, read and written as one table."""
+
+    def __init__(self, name, shards):
+        self.title = name
+        self.shards = shards
+        # Identifies the table to the write-behind queue
+        self.spreadsheet_id = shards[0].spreadsheet_id
+        self.id = ("shards", name)
+
+    def partition(self, rows):
+        """Split {id: values} rows into (shard worksheet, rows) pairs, skipping empty shards."""
+        parts = [{} for _ in self.shards]
+        for row_id, values in rows.items():
+            parts[shard_index(row_id, len(self.shards))][row_id] = values
+        return [(ws, part) for ws, part in zip(self.shards, parts) if part]
+
+
+def merge_values(parts):
+    """One values table from per-shard values, aligned to the first shard's header."""
+    parts = [p for p in parts if p]
+    if not parts:
+        return []
+    header = parts[0][0]
+    merged = [header]
+    for part in parts:
+        positions = [part[0].index(h) if h in part[0] else None for h in header]
+        for row in part[1:]:
+            merged.append(["" if i is None or i >= len(row) else row[i] for i in positions])
+    return merged
+
+
+def open_table(found, name, count=SHARD_COUNT):
+    """
+    The worksheet for `name` from a {title: worksheet} dict, or a ShardedTable
+    when `name` is sharded. None when a worksheet is missing.
+    """
+    if name not in SHARDED_TABLES or count <= 1:
+        return found.get(name)
+    shards = [found.get(n) for n in shard_names(name, count)]
+    if any(ws is None for ws in shards):
+        return None
+    return ShardedTable(name, shards)
+
+
+# ---------------- Migration ----------------
+def split_values(values, id_col, count):
+    """Header plus rows for each shard, from a single worksheet's values."""
+    header, rows = values[0], values[1:]
+    id_idx = header.index(id_col)
+    parts = [[header] for _ in range(count)]
+    for row in rows:
+        parts[shard_index(row[id_idx] if id_idx < len(row) else "", count)].append(row)
+    return parts
+
+
+def main():
+    import gspread
+
+    parser = argparse.ArgumentParser(description="Split the influencer list into hash shards.")
+    parser.add_argument("--credentials", required=True, help="service-account JSON")
+    parser.add_argument("--sheet-id", default=DEFAULT_SHEET_ID, help="spreadsheet holding the list")
+    parser.add_argument("--table", default="Influencers List", help="worksheet to split")
+    parser.add_argument("--id-col", default="ID", help="ID column header")
+    parser.add_argument("--shards", type=int, required=True, help="number of shards (> 1)")
+    args = parser.parse_args()
+    if args.shards <= 1:
+        parser.error("--shards must be greater than 1")
+
+    spreadsheet = gspread.service_account(filename=args.credentials).open_by_key(args.sheet_id)
+    values = spreadsheet.worksheet(args.table).get_all_values()
+    for name, part in zip(shard_names(args.table, args.shards), split_values(values, args.id_col, args.shards)):
+        ws = spreadsheet.add_worksheet(name, rows=max(len(part), 100), cols=len(part[0]))
+        ws.update(part, "A1", value_input_option="RAW")
+        print(f"{name}: {len(part) - 1} rows")
+    print(f"Set INFLUENCER_SHARDS={args.shards} to read and write the shards; '{args.table}' is left untouched.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
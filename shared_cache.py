@@ -0,0 +1,271 @@
+"""
+Sheet data cache shared by every Streamlit process on one host.
+
+Frames are stored in SQLite (INFLUENCER_SHARED_CACHE) as Arrow IPC streams,
+each entry stamped with a content version and its load time. A per-key file
+lock makes sure only one replica refreshes an entry at a time; the others
+wait and then read what it stored. Each process keeps the decoded frames of
+the version it last read, so an unchanged entry is never decoded twice.
+
+The raw rows behind incremental sheet reads (sheets_io.tail_values) live here
+too, so every replica extends the same rows and a write or a Refresh in one
+process makes all of them reload the whole sheet.
+"""
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+
+from id_codes import ID_CODE, add_id_codes
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: refreshes are not serialized across processes
+    fcntl = None
+
+# ---------------- Settings ----------------
+SHARED_CACHE_PATH = os.environ.get("INFLUENCER_SHARED_CACHE", os.path.join(".cache", "shared.sqlite"))
+# How often one replica re-reads a sheet to pick up edits made elsewhere
+POLL_SECONDS = int(os.environ.get("INFLUENCER_SHEETS_POLL", "10"))
+
+_conn = None
+_conn_lock = threading.Lock()
+_db_lock = threading.RLock()
+_memo = {}  # key -> (version, frames)
+_unshared = {}  # key -> (version, loaded_at) of frames that could not be stored
+_memo_lock = threading.Lock()
+_tail_memo = {}  # key -> (stamp, rows)
+
+
+# ---------------- Storage ----------------
+def _connect():
+    """The process-wide connection, created (with the schema) on first use."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            os.makedirs(os.path.dirname(SHARED_CACHE_PATH) or ".", exist_ok=True)
+            # Streamlit runs each rerun on a new thread: one connection serves them all
+            conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=30, check_same_thread=False)
+            # Switching to WAL does not wait on the busy timeout: one process at a time
+            with _file_lock("schema"):
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, version TEXT, loaded_at REAL, data BLOB)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tails ("
+                    "key TEXT PRIMARY KEY, stamp TEXT, loaded_at REAL, data BLOB)"
+                )
+            _conn = conn
+        return _conn
+
+
+@contextlib.contextmanager
+def _db():
+    """The connection, held by one thread at a time; statements inside run in one transaction."""
+    conn = _connect()
+    with _db_lock, conn:
+        yield conn
+
+
+def _encode(frames):
+    """Arrow IPC stream of each frame, without process-local ID codes."""
+    blobs = []
+    for frame in frames:
+        had_codes = ID_CODE in frame.columns
+        table = pa.Table.from_pandas(frame.drop(columns=[ID_CODE]) if had_codes else frame)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"id_codes": b"1" if had_codes else b"0"})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        blobs.append(sink.getvalue().to_pybytes())
+    # Length-prefixed so several frames fit in one entry
+    return b"".join(len(b).to_bytes(8, "little") + b for b in blobs)
+
+
+def _decode(data):
+    frames, pos = [], 0
+    while pos < len(data):
+        size = int.from_bytes(data[pos:pos + 8], "little")
+        table = pa.ipc.open_stream(data[pos + 8:pos + 8 + size]).read_all()
+        frame = table.to_pandas()
+        if (table.schema.metadata or {}).get(b"id_codes") == b"1":
+            add_id_codes(frame)
+        frames.append(frame)
+        pos += 8 + size
+    return frames
+
+
+def _read(key):
+    with _db() as conn:
+        row = conn.execute("SELECT version, loaded_at FROM entries WHERE key = ?", (key,)).fetchone()
+    return row if row is not None else (None, 0.0)
+
+
+def _frames(key, version):
+    with _memo_lock:
+        cached = _memo.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    with _db() as conn:
+        row = conn.execute("SELECT data FROM entries WHERE key = ? AND version = ?", (key, version)).fetchone()
+    if row is None:
+        return None
+    frames = _decode(row[0])
+    with _memo_lock:
+        _memo[key] = (version, frames)
+    return frames
+
+
+def _write(key, frames):
+    data = _encode(frames)
+    version = hashlib.blake2b(data, digest_size=16).hexdigest()
+    with _db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, version, loaded_at, data) VALUES (?, ?, ?, ?)",
+            (key, version, time.time(), sqlite3.Binary(data)),
+        )
+    with _memo_lock:
+        _memo[key] = (version, frames)
+    return version
+
+
+@contextlib.contextmanager
+def _file_lock(name):
+    """Exclusive lock shared by every process on this host."""
+    if fcntl is None:
+        yield
+        return
+    lock_dir = os.path.join(os.path.dirname(SHARED_CACHE_PATH) or ".", "locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    safe = hashlib.md5(name.encode()).hexdigest()
+    with open(os.path.join(lock_dir, f"{safe}.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# ---------------- Public API ----------------
+def shared_frames(key, ttl, loader):
+    """
+    Frames for `key` from the shared cache, calling `loader()` (which returns a
+    list of DataFrames) when the entry is missing or older than `ttl` seconds.
+    Returns (version, frames); the version is a hash of the content, so it can
+    key downstream caches. Callers must not modify the returned frames.
+    Frames that cannot be stored as Arrow are kept in this process only.
+    """
+    with _memo_lock:
+        version, loaded_at = _unshared.get(key, (None, 0.0))
+        if version is not None and time.time() - loaded_at < ttl:
+            return version, _memo[key][1]
+
+    version, loaded_at = _read(key)
+    if version is not None and time.time() - loaded_at < ttl:
+        frames = _frames(key, version)
+        if frames is not None:
+            return version, frames
+
+    with _file_lock(f"refresh:{key}"):
+        # Another replica may have refreshed while we waited for the lock
+        version, loaded_at = _read(key)
+        if version is not None and time.time() - loaded_at < ttl:
+            frames = _frames(key, version)
+            if frames is not None:
+                return version, frames
+
+        frames = list(loader())
+        try:
+            version = _write(key, frames)
+        except (pa.ArrowException, TypeError, ValueError):
+            version = _keep_local(key, frames)
+        return version, frames
+
+
+def _keep_local(key, frames):
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(str(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy().tobytes())
+    version = digest.hexdigest()
+    with _memo_lock:
+        _memo[key] = (version, frames)
+        _unshared[key] = (version, time.time())
+    return version
+
+
+def invalidate(key, full=True):
+    """
+    Force the next shared_frames(key, ...) call in any process to reload.
+    With `full`, sheet tails are dropped too, so that reload reads every row
+    instead of only the appended ones.
+    """
+    with _memo_lock:
+        _unshared.pop(key, None)
+    with _db() as conn:
+        conn.execute("UPDATE entries SET loaded_at = 0 WHERE key = ?", (key,))
+    if full:
+        drop_tails()
+
+
+# ---------------- Sheet Tails ----------------
+def _stamp():
+    return uuid.uuid4().hex
+
+
+def read_tail(key):
+    """
+    (rows, loaded_at, stamp) of a sheet's last read; rows is None if it must be
+    read in full. Pass the stamp to write_tail, which only stores rows if no
+    one dropped the tail in between.
+    """
+    with _db() as conn:
+        conn.execute("INSERT OR IGNORE INTO tails (key, stamp, loaded_at, data) VALUES (?, ?, 0, NULL)", (key, _stamp()))
+        stamp, loaded_at = conn.execute("SELECT stamp, loaded_at FROM tails WHERE key = ?", (key,)).fetchone()
+        with _memo_lock:
+            cached = _tail_memo.get(key)
+        if cached is not None and cached[0] == stamp:
+            return list(cached[1]), loaded_at, stamp
+        data = conn.execute("SELECT data FROM tails WHERE key = ? AND stamp = ?", (key, stamp)).fetchone()
+    if data is None or data[0] is None:
+        return None, 0.0, stamp
+    rows = pa.ipc.open_stream(data[0]).read_all().column("row").to_pylist()
+    with _memo_lock:
+        _tail_memo[key] = (stamp, rows)
+    return list(rows), loaded_at, stamp
+
+
+def write_tail(key, rows, loaded_at, stamp):
+    """Store a sheet's rows unless its tail was dropped or replaced since read_tail returned `stamp`."""
+    table = pa.table({"row": pa.array(rows, type=pa.list_(pa.string()))})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    new_stamp = _stamp()
+    with _db() as conn:
+        stored = conn.execute(
+            "UPDATE tails SET stamp = ?, loaded_at = ?, data = ? WHERE key = ? AND stamp = ?",
+            (new_stamp, loaded_at, sqlite3.Binary(sink.getvalue().to_pybytes()), key, stamp),
+        ).rowcount
+    if stored:
+        with _memo_lock:
+            _tail_memo[key] = (new_stamp, list(rows))
+
+
+def drop_tails(key=None):
+    """Make the next read of one sheet (all sheets if `key` is None), in any process, a full one."""
+    with _db() as conn:
+        if key is None:
+            conn.execute("UPDATE tails SET stamp = lower(hex(randomblob(16))), loaded_at = 0, data = NULL")
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO tails (key, stamp, loaded_at, data) VALUES (?, ?, 0, NULL)", (key, _stamp()),
+            )
@@ -0,0 +1,187 @@
+"""
+Concurrent Google Sheets I/O.
+
+gspread is blocking, so every call runs on a worker thread under one
+process-wide asyncio loop, limited by a semaphore. The sync facade
+(open_worksheets, fetch_values, run_concurrently) is what Streamlit pages
+call: a cold load then takes about as long as its slowest request.
+"""
+import asyncio
+import os
+import threading
+import time
+
+from gspread.utils import rowcol_to_a1
+
+import shared_cache
+from shards import ShardedTable, merge_values
+
+# ---------------- Settings ----------------
+MAX_CONCURRENCY = int(os.environ.get("INFLUENCER_SHEETS_CONCURRENCY", "6"))
+# Sheets above this many rows are read as parallel row ranges
+CHUNK_ROWS = 5000
+
+
+# ---------------- Event Loop ----------------
+_loop = None
+_loop_lock = threading.Lock()
+_semaphore = None
+
+
+def _get_loop():
+    global _loop, _semaphore
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="sheets-io").start()
+            _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        return _loop
+
+
+def run(coro):
+    """Run a coroutine on the Sheets I/O loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+async def call(fn, *args, **kwargs):
+    """One blocking gspread call on a worker thread, within the concurrency limit."""
+    async with _semaphore:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# ---------------- Async API ----------------
+def _trim(rows):
+    """Drop trailing empty rows and columns and pad short rows, as get_all_values does."""
+    while rows and not any(rows[-1]):
+        rows.pop()
+    width = max((i + 1 for row in rows for i, v in enumerate(row) if v != ""), default=0)
+    return [list(row[:width]) + [""] * (width - len(row)) for row in rows]
+
+
+def _column_letter(col):
+    return rowcol_to_a1(1, max(col, 1)).rstrip("0123456789")
+
+
+async def worksheets(client, sheet_id, names=None):
+    """
+    Worksheets by title, all of them if `names` is None. Costs two metadata
+    requests (open_by_key, then the worksheet list).
+    """
+    spreadsheet = await call(client.open_by_key, sheet_id)
+    found = await call(spreadsheet.worksheets)
+    return {ws.title: ws for ws in found if names is None or ws.title in names}
+
+
+async def values(ws, chunk_rows=CHUNK_ROWS, incremental=False):
+    """All cell values of a worksheet; large sheets are read as concurrent row ranges."""
+    if isinstance(ws, ShardedTable):
+        return merge_values(await asyncio.gather(*(values(shard, chunk_rows, incremental) for shard in ws.shards)))
+    if incremental:
+        return await tail_values(ws, chunk_rows)
+    if ws.row_count <= chunk_rows:
+        return await call(ws.get_all_values)
+
+    # row_count comes from cached metadata and may be behind the sheet: the
+    # last range is open-ended so rows added since are still read
+    last_col = _column_letter(ws.col_count)
+    starts = list(range(1, ws.row_count + 1, chunk_rows))
+    ranges = [f"A{start}:{last_col}{start + chunk_rows - 1}" for start in starts[:-1]]
+    ranges.append(f"A{starts[-1]}:{last_col}")
+    # maintain_size keeps empty rows inside a bounded range, so chunks line up
+    chunks = await asyncio.gather(*(call(ws.get_values, r, maintain_size=True) for r in ranges))
+    return _trim([row for chunk in chunks for row in chunk])
+
+
+async def gather_values(sheets, chunk_rows=CHUNK_ROWS, incremental=False):
+    return await asyncio.gather(*(values(ws, chunk_rows, incremental) for ws in sheets))
+
+
+async def gather_calls(calls):
+    return await asyncio.gather(*(call(fn, *args, **kwargs) for fn, args, kwargs in calls))
+
+
+# ---------------- Tail Fetch ----------------
+# Append-mostly sheets: re-read only a boundary window plus the rows after it
+BOUNDARY_ROWS = 20
+FULL_RELOAD_INTERVAL = 600  # seconds; catches edits above the boundary window
+
+_tail_locks = {}
+
+
+def _same(a, b):
+    """Row equality ignoring trailing empty cells."""
+    def strip(row):
+        row = list(row)
+        while row and row[-1] == "":
+            row.pop()
+        return row
+    return len(a) == len(b) and all(strip(x) == strip(y) for x, y in zip(a, b))
+
+
+def _tail_key(ws):
+    return f"{ws.spreadsheet_id}:{ws.id}"
+
+
+async def tail_values(ws, chunk_rows=CHUNK_ROWS):
+    """
+    Values of a worksheet, fetching only rows added since the last read. The
+    header and the last BOUNDARY_ROWS known rows are re-read with the new
+    rows in one request; if they changed (edits, deletes, a new column), or
+    FULL_RELOAD_INTERVAL has passed, the whole sheet is reloaded. Known rows
+    are kept in the shared cache, so replicas on this host extend the same rows.
+    """
+    key = _tail_key(ws)
+    # Readers of the same sheet must not extend the cached rows twice
+    async with _tail_locks.setdefault(key, asyncio.Lock()):
+        return await _tail_values(ws, key, chunk_rows)
+
+
+async def _tail_values(ws, key, chunk_rows):
+    known, loaded_at, stamp = await asyncio.to_thread(shared_cache.read_tail, key)
+    now = time.time()
+    if known is None or now - loaded_at >= FULL_RELOAD_INTERVAL or len(known) < 2:
+        data = await values(ws, chunk_rows)
+        await asyncio.to_thread(shared_cache.write_tail, key, data, now, stamp)
+        return data
+
+    start = max(2, len(known) - BOUNDARY_ROWS + 1)
+    width = len(known[0])
+    header, window = await call(ws.batch_get, ["1:1", f"A{start}:{_column_letter(max(ws.col_count, width))}"])
+    boundary = known[start - 1:]
+    if not _same(header[:1], known[:1]) or not _same(window[:len(boundary)], boundary):
+        data = await values(ws, chunk_rows)
+        await asyncio.to_thread(shared_cache.write_tail, key, data, now, stamp)
+        return data
+
+    added = window[len(boundary):]
+    if added:
+        # Pad new rows like get_all_values does
+        known.extend(list(row[:width]) + [""] * (width - len(row)) for row in added)
+        await asyncio.to_thread(shared_cache.write_tail, key, known, loaded_at, stamp)
+    return known
+
+
+def forget_tail(ws):
+    """Make the next read of a worksheet, in any process, a full one, e.g. after rows above the tail were edited."""
+    shared_cache.drop_tails(_tail_key(ws))
+
+
+# ---------------- Sync Facade ----------------
+def open_worksheets(client, sheet_id, names=None):
+    return run(worksheets(client, sheet_id, names))
+
+
+def fetch_values(sheets, chunk_rows=CHUNK_ROWS, incremental=False):
+    """
+    Values of several worksheets at once, in the order given. With
+    `incremental`, sheets read before only fetch their new rows (tail_values).
+    """
+    return run(gather_values(list(sheets), chunk_rows, incremental))
+
+
+def run_concurrently(calls):
+    """
+    Run independent blocking calls, given as (fn, args, kwargs) tuples,
+    concurrently. Returns their results in order; the first error is raised.
+    """
+    return run(gather_calls(calls))
@@ -0,0 +1,115 @@
+"""
+Process-wide Google Sheets client pool and handle cache.
+
+One gspread client is shared by every session. Its HTTP session keeps a
+connection pool sized for sheets_io's concurrency and asks for gzip. Its
+credentials are refreshed before they expire, and the client is rebuilt after
+repeated failures. Spreadsheet and worksheet handles are cached per sheet ID
+for METADATA_TTL seconds, so opening a worksheet costs no round-trip.
+"""
+import datetime
+import threading
+import time
+
+import gspread
+from google.auth.exceptions import RefreshError, TransportError
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+
+import sheets_io
+from process_state import process_singleton
+
+# ---------------- Settings ----------------
+METADATA_TTL = 300               # seconds a spreadsheet's worksheet list is reused
+CREDENTIAL_REFRESH_MARGIN = 300  # refresh the token this many seconds before it expires
+MAX_FAILURES = 3                 # consecutive failures before the client is rebuilt
+
+
+class ClientPool:
+    """Hands out a healthy gspread client built from `make_credentials()`."""
+
+    def __init__(self, make_credentials):
+        self.make_credentials = make_credentials
+        self._lock = threading.Lock()
+        self._client = None
+        self._credentials = None
+        self._failures = 0
+        self._handles = {}  # sheet_id -> (fetched_at, client, {title: worksheet})
+
+    # ---------------- Clients ----------------
+    def _build(self):
+        credentials = self.make_credentials()
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(sheets_io.MAX_CONCURRENCY, 10))
+        session.mount("https://", adapter)
+        # Google APIs only compress responses for clients that say "gzip" in the user agent
+        session.headers.update({"Accept-Encoding": "gzip", "User-Agent": "influencer-checker (gzip)"})
+        self._credentials = credentials
+        self._client = gspread.Client(auth=None, session=session)
+        self._failures = 0
+        self._handles = {}
+
+    def _expiring(self):
+        expiry = getattr(self._credentials, "expiry", None)
+        if expiry is None:
+            return not self._credentials.valid
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds() < CREDENTIAL_REFRESH_MARGIN
+
+    def client(self):
+        """The pooled client, built on first use and refreshed ahead of token expiry."""
+        with self._lock:
+            if self._client is None:
+                self._build()
+            elif self._expiring():
+                try:
+                    self._credentials.refresh(Request())
+                except (RefreshError, TransportError):
+                    self._build()
+            return self._client
+
+    def report_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def report_failure(self, error):
+        """Count a failed call; auth errors or MAX_FAILURES in a row evict the client."""
+        auth_error = isinstance(error, RefreshError) or (
+            isinstance(error, gspread.exceptions.APIError) and error.response.status_code in (401, 403)
+        )
+        with self._lock:
+            self._failures += 1
+            if auth_error or self._failures >= MAX_FAILURES:
+                self._client = None
+                self._handles = {}
+
+    # ---------------- Handles ----------------
+    def worksheets(self, sheet_id, client=None):
+        """All worksheets of a spreadsheet by title, cached per client for METADATA_TTL."""
+        client = client or self.client()
+        with self._lock:
+            cached = self._handles.get(sheet_id)
+            if cached is not None and cached[1] is client and time.monotonic() - cached[0] < METADATA_TTL:
+                return cached[2]
+        try:
+            found = sheets_io.open_worksheets(client, sheet_id)
+        except Exception as e:
+            self.report_failure(e)
+            raise
+        self.report_success()
+        with self._lock:
+            self._handles[sheet_id] = (time.monotonic(), client, found)
+        return found
+
+    def invalidate(self, sheet_id=None):
+        """Forget cached handles, e.g. after worksheets were added or renamed."""
+        with self._lock:
+            if sheet_id is None:
+                self._handles = {}
+            else:
+                self._handles.pop(sheet_id, None)
+
+
+@process_singleton
+def get_client_pool(make_credentials):
+    return ClientPool(make_credentials)
@@ -0,0 +1,247 @@
+import functools
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+
+import pandas as pd
+import streamlit as st
+
+from process_state import process_alive
+from profiling import profile_fragment
+
+# Reaching other sessions' state needs Streamlit internals; without them
+# frames are never spilled and accounting is skipped
+try:
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    Runtime = get_script_run_ctx = None
+
+# ---------------- Settings ----------------
+SPILL_ROOT = os.environ.get("INFLUENCER_SPILL_DIR", os.path.join(".cache", "spill"))
+# One directory per process; the suffix keeps a reused PID from sharing it
+SPILL_DIR = os.path.join(SPILL_ROOT, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+MEMORY_BUDGET_MB = int(os.environ.get("INFLUENCER_MEMORY_BUDGET_MB", "1024"))
+SPILL_IDLE_SECONDS = int(os.environ.get("INFLUENCER_SPILL_IDLE_SECONDS", "600"))
+# Closed sessions are forgotten (and their spill files removed) after this long
+SESSION_TTL_SECONDS = int(os.environ.get("INFLUENCER_SESSION_TTL_SECONDS", "3600"))
+# A frame kept under the same key is re-measured at most this often (it may be edited in place)
+MEASURE_INTERVAL_SECONDS = int(os.environ.get("INFLUENCER_MEASURE_INTERVAL_SECONDS", "30"))
+
+
+def remove_stale_spills():
+    """Delete spill directories of processes that are no longer running."""
+    if not os.path.isdir(SPILL_ROOT):
+        return
+    for name in os.listdir(SPILL_ROOT):
+        pid = name.split("-", 1)[0]
+        if pid.isdigit() and int(pid) != os.getpid() and not process_alive(int(pid)):
+            shutil.rmtree(os.path.join(SPILL_ROOT, name), ignore_errors=True)
+
+
+remove_stale_spills()
+
+
+class Spilled:
+    """Placeholder left in session state for a frame written to disk."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f"Spilled({self.path!r})"
+
+
+# ---------------- Session Registry ----------------
+_sessions = {}
+_lock = threading.Lock()
+
+
+def _frame_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return 0
+
+
+def _current():
+    """(session id, persistent SessionState) of the running script, or (None, None)."""
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    if ctx is None:
+        return None, None
+    # ctx.session_state is a per-run wrapper; the inner state lives as long as the session
+    state = getattr(ctx.session_state, "_state", None)
+    return (ctx.session_id, state) if state is not None else (None, None)
+
+
+def _session_closed(session_id):
+    try:
+        return not Runtime.instance().is_active_session(session_id)
+    except Exception:
+        return True  # unknown: the idle TTL alone decides
+
+
+def _restore(entry, state):
+    for key, path in list(entry["spilled"].items()):
+        try:
+            frame = pd.read_parquet(path)
+        except Exception:
+            # Pages reload what is missing
+            frame = None
+        state[key] = frame
+        if os.path.exists(path):
+            os.remove(path)
+        del entry["spilled"][key]
+
+
+def _spill(session_id, entry):
+    """Write an idle session's frames to parquet. Returns the bytes freed."""
+    state = entry["state"]
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    freed = 0
+    for key in entry["keys"]:
+        value = state[key] if key in state else None
+        if not isinstance(value, pd.DataFrame):
+            continue
+        path = os.path.join(SPILL_DIR, f"{session_id}-{key}-{uuid.uuid4().hex[:8]}.parquet")
+        try:
+            value.to_parquet(path)
+        except Exception:
+            # Mixed-type columns and the like stay in memory
+            if os.path.exists(path):
+                os.remove(path)
+            continue
+        # del + set also drops the copy Streamlit keeps from the last run
+        del state[key]
+        state[key] = Spilled(path)
+        entry["spilled"][key] = path
+        freed += entry["sizes"].pop(key, 0)
+    return freed
+
+
+def _prune(now):
+    """Forget sessions that have been closed for SESSION_TTL_SECONDS."""
+    for session_id, entry in list(_sessions.items()):
+        if now - entry["last_active"] >= SESSION_TTL_SECONDS and _session_closed(session_id):
+            for path in entry["spilled"].values():
+                if os.path.exists(path):
+                    os.remove(path)
+            del _sessions[session_id]
+
+
+def total_bytes():
+    with _lock:
+        return sum(size for e in _sessions.values() for size in e["sizes"].values())
+
+
+def memory_report():
+    """Per-session in-memory bytes and spilled keys, largest first."""
+    with _lock:
+        rows = [
+            {
+                "Session": session_id,
+                "MB": sum(e["sizes"].values()) / 1e6,
+                "Spilled": ", ".join(sorted(e["spilled"])),
+                "Idle (s)": int(time.monotonic() - e["last_active"]),
+            }
+            for session_id, e in _sessions.items()
+        ]
+    return sorted(rows, key=lambda r: r["MB"], reverse=True)
+
+
+def _measure(session_id, state):
+    """
+    Re-measure a session's frames whose object changed, or that were last
+    measured MEASURE_INTERVAL_SECONDS ago; the others keep their size.
+    """
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry is None:
+            return 0
+        keys, sizes, measured = set(entry["keys"]), dict(entry["sizes"]), dict(entry["measured"])
+    # Deep measurement happens outside the lock, so other sessions are not held up
+    now = time.monotonic()
+    current = {}
+    for key in keys:
+        value = state[key] if key in state else None
+        if not isinstance(value, pd.DataFrame):
+            continue
+        ref, measured_at = measured.get(key, (None, None))
+        if key in sizes and ref is not None and ref() is value and now - measured_at < MEASURE_INTERVAL_SECONDS:
+            current[key] = sizes[key]
+            continue
+        current[key] = _frame_bytes(value)
+        measured[key] = (weakref.ref(value), now)
+    with _lock:
+        if _sessions.get(session_id) is entry:
+            # Spilled keys keep no size
+            entry["sizes"] = {k: v for k, v in current.items() if k not in entry["spilled"]}
+            entry["measured"] = {k: v for k, v in measured.items() if k in entry["sizes"]}
+    return sum(current.values())
+
+
+def touch():
+    """Mark the current session active and bring back any spilled frames."""
+    session_id, state = _current()
+    if state is None:
+        return
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry is None:
+            return
+        entry["last_active"] = time.monotonic()
+        _restore(entry, state)
+
+
+def track_session(keys):
+    """
+    Account for this session's large frames under `keys`, restoring any that
+    were spilled while it was idle. If the process total exceeds
+    MEMORY_BUDGET_MB, frames of sessions idle for SPILL_IDLE_SECONDS are
+    written to disk, least recently active first. Returns this session's bytes.
+    """
+    session_id, state = _current()
+    if state is None:
+        return 0
+    now = time.monotonic()
+    with _lock:
+        _prune(now)
+        entry = _sessions.setdefault(
+            session_id, {"state": state, "keys": set(), "sizes": {}, "measured": {}, "spilled": {}, "last_active": now}
+        )
+        entry["keys"].update(keys)
+        entry["last_active"] = now
+        _restore(entry, state)
+
+    mine = _measure(session_id, state)
+    with _lock:
+        total = sum(size for e in _sessions.values() for size in e["sizes"].values())
+        budget = MEMORY_BUDGET_MB * 1024 * 1024
+        if total > budget:
+            idle = sorted(
+                (e["last_active"], sid) for sid, e in _sessions.items()
+                if sid != session_id and now - e["last_active"] >= SPILL_IDLE_SECONDS
+            )
+            for _, sid in idle:
+                total -= _spill(sid, _sessions[sid])
+                if total <= budget:
+                    break
+    return mine
+
+
+def session_fragment(func):
+    """st.fragment that restores spilled frames before a partial rerun, and is profiled on its own."""
+    func = profile_fragment(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        touch()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session_id, state = _current()
+            if state is not None:
+                _measure(session_id, state)
+    return st.fragment(wrapper)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def shared_db(tmp_path, monkeypatch):
+    """shared_cache backed by an empty database of its own."""
+    import shared_cache
+    monkeypatch.setattr(shared_cache, "SHARED_CACHE_PATH", str(tmp_path / "shared.sqlite"))
+    monkeypatch.setattr(shared_cache, "_conn", None)
+    monkeypatch.setattr(shared_cache, "_memo", {})
+    monkeypatch.setattr(shared_cache, "_unshared", {})
+    monkeypatch.setattr(shared_cache, "_tail_memo", {})
+    return shared_cache
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from facets import FacetIndex
+
+
+def test_counts_and_select_follow_updates():
+    df = pd.DataFrame({"Credibility": [True, False, True], "Comment": ["ok", "spam", None]})
+    facets = FacetIndex(df)
+    assert (len(facets), facets.count(True), facets.count(False)) == (3, 2, 1)
+    assert list(facets.select(cred=True)) == [0, 2]
+
+    facets.update(2, False, "spam")
+    facets.remove(0)
+    facets.add(-1, True, "ok")
+    assert facets.count(False) == 2
+    assert list(facets.select(cred=False, comment="spam")) == [1, 2]
+    assert list(facets.select(comment="ok")) == [-1]
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from history import DATE_COL, history_aggregates
+from id_codes import get_id_dictionary
+
+
+def test_aggregates_and_price_trend():
+    master = pd.DataFrame({
+        "ID": ["a", "a", "b", "b"],
+        "Post Price": ["100", "150", "0", "50"],
+        "Follower": ["1000", "1200", "10", "20"],
+        DATE_COL: ["2024-01-01", "2024-02-01", "2024-01-01", "2024-03-01"],
+        "Campaign name": ["x", "y", "x", "x"],
+    })
+    dictionary = get_id_dictionary()
+    aggs = history_aggregates(master, dictionary)
+    a = aggs.loc[dictionary.code("a")]
+    assert (a["Last Price"], a["Price Trend %"], a["Campaigns"]) == (150, 50.0, 2)
+    assert a["Last Campaign"] == "2024-02-01"
+    # A first price of 0 gives no trend instead of inf
+    assert np.isnan(aggs.loc[dictionary.code("b"), "Price Trend %"])
+
+
+def test_missing_master_gives_empty_frame():
+    assert history_aggregates(None).empty
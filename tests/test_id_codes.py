@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import id_codes
+from id_codes import ID_CODE, IdDictionary, add_id_codes, canonical_id, canonical_ids, get_id_dictionary
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("https://instagram.com/Foo.Bar/?hl=en", "foo.bar"),
+    ("https://www.instagram.com/foo_bar", "foo_bar"),
+    ("http://m.instagram.com/foo", "foo"),
+    ("instagram.com/@foo", "foo"),
+    ("@Foo", "foo"),
+    ("  foo​ ", "foo"),
+    # Dotted handles are not hosts
+    ("m.rezaei", "m.rezaei"),
+    ("www.ali", "www.ali"),
+    ("@m.rezaei", "m.rezaei"),
+    ("https://instagram.com/m.rezaei", "m.rezaei"),
+    # Post and reel links are kept as they are
+    ("https://www.instagram.com/p/ABC/", "https://www.instagram.com/p/abc/"),
+    ("instagram.com/reel/xyz", "instagram.com/reel/xyz"),
+    # Other sites are kept whole, not cut down to their host
+    ("https://www.tiktok.com/@alice", "https://www.tiktok.com/@alice"),
+    ("https://www.tiktok.com/@Bob", "https://www.tiktok.com/@bob"),
+    ("https://t.me/foo", "https://t.me/foo"),
+    ("youtube.com/@foo", "youtube.com/@foo"),
+    (None, ""),
+    (float("nan"), ""),
+])
+def test_canonical_id(raw, expected):
+    assert canonical_id(raw) == expected
+
+
+def test_canonical_ids_matches_scalar_form():
+    raw = ["https://instagram.com/Foo.Bar/?hl=en", "m.rezaei", "www.ali", "@m.rezaei",
+           "instagram.com/p/abc", "https://www.tiktok.com/@alice", "https://t.me/foo", None, "FOO.BAR", "m.rezaei"]
+    series = pd.Series(raw, index=range(10, 20), name="ID")
+    result = canonical_ids(series)
+    assert list(result) == [canonical_id(v) for v in raw]
+    assert list(result.index) == list(series.index)
+    assert result.name == "ID"
+
+
+def test_other_sites_stay_distinct():
+    ids = canonical_ids(pd.Series(["https://www.tiktok.com/@alice", "https://www.tiktok.com/@bob", "https://t.me/foo"]))
+    assert ids.nunique() == 3
+
+
+def test_encode_decode_round_trip():
+    d = IdDictionary()
+    ids = ["b", "a", "b", "c", "a"]
+    codes = d.encode(ids)
+    assert codes.dtype == np.int32
+    assert list(d.decode(codes)) == ids
+    # Codes are stable across calls
+    assert list(d.encode(["c", "a"])) == [codes[3], codes[1]]
+    assert d.code("a") == codes[1]
+    assert d.code("never seen") == -1
+
+
+def test_frames_share_one_dictionary():
+    a = add_id_codes(pd.DataFrame({"ID": ["x", "y"]}))
+    b = add_id_codes(pd.DataFrame({"ID": ["y", "z"]}))
+    assert a[ID_CODE].iloc[1] == b[ID_CODE].iloc[0]
+
+def test_dictionary_rotates_when_full(monkeypatch):
+    monkeypatch.setattr(id_codes, "MAX_IDS", 3)
+    monkeypatch.setattr(id_codes, "_dictionary", IdDictionary())
+    old = get_id_dictionary()
+    df = add_id_codes(pd.DataFrame({"ID": ["a", "b", "c"]}))
+    assert get_id_dictionary() is not old
+    new = get_id_dictionary()
+    assert new.generation == old.generation + 1
+    assert len(new) == 0
+
+    # Codes from the old generation are re-encoded, never compared directly
+    other = add_id_codes(pd.DataFrame({"ID": ["z", "c"]}))
+    codes = id_codes.id_codes(df, dictionary=new)
+    assert codes[2] == other[ID_CODE].iloc[1]
+    assert list(new.decode(codes)) == ["a", "b", "c"]
+
+
+def test_id_codes_uses_column_of_same_generation(monkeypatch):
+    monkeypatch.setattr(id_codes, "_dictionary", IdDictionary())
+    df = add_id_codes(pd.DataFrame({"ID": ["a", "b"]}))
+    df[ID_CODE] = np.array([7, 9], dtype=np.int32)  # not re-encoded while current
+    assert list(id_codes.id_codes(df)) == [7, 9]
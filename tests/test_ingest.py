@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from ingest import classify, map_column_name, map_columns, parse_numbers
+
+
+def test_parse_numbers_understands_human_formats():
+    series = pd.Series(["12.5K", "1.2M", "3,400", "$250", "15%", "-2k", "42", "n/a", None])
+    values, recovered = parse_numbers(series)
+    expected = [12500, 1.2e6, 3400, 250, 15, -2000, 42, np.nan, np.nan]
+    np.testing.assert_allclose(values.to_numpy(dtype=float), expected)
+    assert recovered == 6
+
+
+def test_parse_numbers_fast_path_for_plain_numbers():
+    values, recovered = parse_numbers(pd.Series(["1", "2.5"]))
+    assert list(values) == [1, 2.5]
+    assert recovered == 0
+
+
+def test_map_column_name_uses_aliases():
+    assert map_column_name("Username") == "ID"
+
+
+def test_map_columns_aliases():
+    assert map_columns(pd.DataFrame(columns=["Username", "Total Followers", "notes"])) == ["ID", "Followers", "notes"]
+
+
+def test_map_columns_sniffs_unresolved_headers():
+    df = pd.DataFrame({"c1": ["$100", "$250", "$80"], "c2": ["ali.r", "sara_k", "mina"], "c3": ["12k", "3.4m", "800k"]})
+    assert map_columns(df) == ["Post price", "ID", "Followers"]
+
+
+def test_map_columns_sniffs_each_file_with_unresolved_headers():
+    prices_first = pd.DataFrame({"c1": ["$100", "$250", "$80"], "c2": ["ali.r", "sara_k", "mina"]})
+    ids_first = pd.DataFrame({"c1": ["ali.r", "sara_k", "mina"], "c2": ["$100", "$250", "$80"]})
+    assert map_columns(prices_first) == ["Post price", "ID"]
+    assert map_columns(ids_first) == ["ID", "Post price"]
+
+
+def test_map_columns_falls_back_to_first_column_as_id():
+    assert map_columns(pd.DataFrame({"c1": ["1", "2"], "c2": ["x", "x"]})) == ["ID", "c2"]
+
+
+def test_classify_splits_by_credibility():
+    new_df = pd.DataFrame({"ID": ["a", "b", "c", "d"]})
+    inf_df = pd.DataFrame({"ID": ["a", "b"], "Comment": ["", "spam"], "Credibility": ["true", "false"]})
+    pending, rejected, unknown = classify(new_df, inf_df, added={"d": {"Comment": "", "Credibility": "true"}})
+    assert list(pending["ID"]) == ["a", "d"]
+    assert list(rejected["ID"]) == ["b"] and list(rejected["Comment"]) == ["spam"]
+    assert list(unknown["ID"]) == ["c"]
+    assert unknown["Link"].iloc[0] == "https://www.instagram.com/c"
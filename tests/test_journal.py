@@ -0,0 +1,135 @@
+import os
+
+import pandas as pd
+
+import journal
+from journal import Journal, apply_journal, coalesce
+
+
+def make_journal(tmp_path):
+    return Journal("test", directory=str(tmp_path))
+
+
+def test_entries_survive_restart(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "ok", True, session="s1")
+    journal.append("add", "b", None, False, session="s2")
+
+    replayed = make_journal(tmp_path).pending()
+    assert [(e["op"], e["id"], e["comment"], e["credibility"]) for e in replayed] == [
+        ("edit", "a", "ok", True),
+        ("add", "b", None, False),
+    ]
+
+
+def test_pending_is_scoped_per_session(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "x", True, session="s1")
+    journal.append("edit", "b", "y", True, session="s2")
+    assert [e["id"] for e in journal.pending("s1")] == ["a"]
+    assert [e["id"] for e in journal.pending()] == ["a", "b"]
+
+
+def test_mark_flushed_drops_only_that_batch(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "x", True)
+    first = journal.take_batch()
+    journal.append("edit", "b", "y", True)
+    second = journal.take_batch()
+
+    journal.mark_flushed(second)
+    assert [e["id"] for e in journal.pending()] == ["a"]
+    assert [e["id"] for e in make_journal(tmp_path).pending()] == ["a"]
+
+    journal.mark_flushed(first)
+    assert journal.pending() == []
+    assert make_journal(tmp_path).pending() == []
+
+
+def test_release_returns_only_the_failed_batch(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "x", True)
+    first = journal.take_batch()
+    journal.append("edit", "b", "y", True)
+    second = journal.take_batch()
+
+    journal.release(first)
+    # The second batch is still in flight and must not be handed out again
+    assert [e["id"] for e in journal.take_batch()] == ["a"]
+    journal.mark_flushed(second)
+    assert [e["id"] for e in journal.pending()] == ["a"]
+
+
+def test_release_drops_entries_superseded_by_newer_ones(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "old", True)
+    first = journal.take_batch()
+    journal.append("edit", "@A", "new", False)
+    second = journal.take_batch()
+
+    journal.release(first)
+    assert journal.take_batch() == []
+    journal.mark_flushed(second)
+    assert journal.pending() == []
+
+
+def test_seq_continues_after_fresh_log(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append("edit", "a", "x", True)
+    journal.mark_flushed(journal.take_batch())
+    seq = make_journal(tmp_path).append("edit", "b", "y", True)
+    assert seq > 1
+
+
+def test_coalesce_keeps_final_state_and_add():
+    entries = [
+        {"seq": 1, "op": "add", "id": "Foo", "comment": "a", "credibility": True},
+        {"seq": 2, "op": "edit", "id": "@foo", "comment": "b", "credibility": False},
+        {"seq": 3, "op": "edit", "id": "bar", "comment": "c", "credibility": True},
+    ]
+    rows = {r["id"]: r for r in coalesce(entries)}
+    assert rows["foo"]["op"] == "add"
+    assert (rows["foo"]["comment"], rows["foo"]["credibility"]) == ("b", False)
+    assert rows["bar"]["op"] == "edit"
+
+
+def test_apply_journal_updates_and_prepends():
+    df = pd.DataFrame({"ID": ["a", "b"], "Comment": ["", ""], "Credibility": [False, False]}, index=[0, 1])
+    entries = [
+        {"seq": 1, "op": "edit", "id": "b", "comment": "good", "credibility": True},
+        {"seq": 2, "op": "add", "id": "c", "comment": None, "credibility": False},
+    ]
+    out = apply_journal(df, entries, "ID", "Comment")
+    assert list(out["ID"]) == ["c", "a", "b"]
+    assert out.index.is_monotonic_increasing
+    assert out.loc[out["ID"] == "b", "Credibility"].item() is True
+
+
+def journal_of(tmp_path, monkeypatch, pid, alive=()):
+    """The journal a process with `pid` would open, with only `alive` PIDs running."""
+    monkeypatch.setattr(journal.os, "getpid", lambda: pid)
+    monkeypatch.setattr(journal, "process_alive", lambda other: other in alive)
+    return make_journal(tmp_path)
+
+
+def test_replicas_do_not_touch_each_others_entries(tmp_path, monkeypatch):
+    a = journal_of(tmp_path, monkeypatch, 101, alive={102})
+    b = journal_of(tmp_path, monkeypatch, 102, alive={101})
+    a.append("edit", "a", "x", True)
+    b.append("edit", "b", "y", True)
+    a.mark_flushed(a.take_batch())
+
+    restarted_b = journal_of(tmp_path, monkeypatch, 102, alive={101})
+    assert [e["id"] for e in restarted_b.pending()] == ["b"]
+
+
+def test_dead_process_entries_are_adopted_once(tmp_path, monkeypatch):
+    dead = journal_of(tmp_path, monkeypatch, 201)
+    dead.append("edit", "a", "x", True, session="s1")
+    dead.append("edit", "b", "y", True)
+    dead.mark_flushed(dead.pending()[1:])
+
+    heir = journal_of(tmp_path, monkeypatch, 202)
+    assert [(e["id"], e["session"]) for e in heir.pending()] == [("a", "s1")]
+    assert not os.path.exists(dead.path)
+    assert [e["id"] for e in journal_of(tmp_path, monkeypatch, 202).pending()] == ["a"]
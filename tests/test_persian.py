@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from persian import add_gregorian_dates, jalali_to_gregorian, normalize_digits, parse_jalali
+
+
+@pytest.mark.parametrize("jalali, gregorian", [
+    ("1403/01/01", "2024-03-20"),
+    ("1402/05/17", "2023-08-08"),
+    ("1399/12/30", "2021-03-20"),
+    ("1403/12/30", "2025-03-20"),
+    ("۱۴۰۲/۰۱/۰۱", "2023-03-21"),
+    ("1400-7-1", "2021-09-23"),
+])
+def test_parse_jalali(jalali, gregorian):
+    assert parse_jalali(pd.Series([jalali]))[0] == pd.Timestamp(gregorian)
+
+
+@pytest.mark.parametrize("invalid", ["1402/12/30", "1402/07/31", "1402/13/01", "hello", None])
+def test_parse_jalali_invalid_is_nat(invalid):
+    assert pd.isna(parse_jalali(pd.Series([invalid]))[0])
+
+
+def test_round_trip_over_consecutive_days():
+    # Consecutive Jalali days across several years map to consecutive Gregorian days
+    years, months, days = [], [], []
+    for y in range(1398, 1406):
+        for m in range(1, 13):
+            last = 31 if m <= 6 else 30
+            for d in range(1, last + 1):
+                years.append(y)
+                months.append(m)
+                days.append(d)
+    series = pd.Series([f"{y}/{m}/{d}" for y, m, d in zip(years, months, days)])
+    parsed = parse_jalali(series)
+    valid = parsed.notna().to_numpy()
+    gregorian = jalali_to_gregorian(np.array(years)[valid], np.array(months)[valid], np.array(days)[valid])
+    assert (np.diff(gregorian).astype(int) == 1).all()
+    assert (parsed[valid].to_numpy().astype("datetime64[D]") == gregorian).all()
+
+
+def test_normalize_digits_and_gregorian_column():
+    df = pd.DataFrame({"Date": ["۱۴۰۳/۰۱/۰۱", "1403/01/02"], "Price": ["۱۲٬۵۰۰", None]})
+    normalize_digits(df)
+    assert list(df["Price"].iloc[:1]) == ["12,500"] and pd.isna(df["Price"].iloc[1])
+    add_gregorian_dates(df)
+    assert list(df["Date (Gregorian)"]) == [pd.Timestamp("2024-03-20"), pd.Timestamp("2024-03-21")]
@@ -0,0 +1,96 @@
+import pandas as pd
+
+from facets import FacetIndex
+from reconcile import diff_snapshots, reconcile, row_snapshot
+from upsert import compact, select_rows
+
+COLS = ["Comment", "Credibility"]
+
+
+def sheet(rows):
+    return pd.DataFrame(rows, columns=["ID", "Comment", "Credibility"])
+
+
+def session_table(df):
+    table = df.copy()
+    id_index = {row_id: label for label, row_id in zip(table.index, table["ID"])}
+    return table, id_index, FacetIndex(table)
+
+
+def test_diff_snapshots_finds_inserts_updates_and_deletes():
+    old = sheet([("a", "", True), ("b", "", True), ("c", "", False)])
+    new = sheet([("a", "", True), ("b", "spam", False), ("d", "", True)])
+    inserts, updates, deletes = diff_snapshots(row_snapshot(old, "ID", COLS), row_snapshot(new, "ID", COLS))
+    assert (inserts, updates, deletes) == (["d"], ["b"], ["c"])
+
+
+def test_last_duplicate_wins_in_snapshot():
+    snapshot = row_snapshot(sheet([("a", "x", True), ("a", "y", True)]), "ID", COLS)
+    assert len(snapshot) == 1
+    assert snapshot["pos"].item() == 1
+
+
+def test_reconcile_applies_remote_changes():
+    old = sheet([("a", "", True), ("b", "", True), ("c", "", False)])
+    new = sheet([("a", "", True), ("b", "spam", False), ("d", "new", True)])
+    table, id_index, facets = session_table(old)
+    snapshot = row_snapshot(new, "ID", COLS)
+    diff = diff_snapshots(row_snapshot(old, "ID", COLS), snapshot)
+
+    base = table
+    buffer, changed, conflicts = reconcile(base, None, id_index, facets, new, snapshot, diff, set(), "ID", "Comment")
+
+    assert conflicts == []
+    assert changed == 3
+    # The base table is updated in place, not copied
+    assert table is base and table.at[id_index["b"], "Comment"] == "spam"
+    assert list(buffer["ID"]) == ["d"]
+    # "c" is a tombstone: still in the frame, gone from the index and facets
+    assert "c" not in id_index and len(table) == 3
+    assert facets.count(True) == 2 and facets.count(False) == 1
+    assert list(select_rows(table, buffer, facets.select())["ID"]) == ["d", "a", "b"]
+    assert list(compact(table, buffer, facets)["ID"]) == ["d", "a", "b"]
+
+
+def test_unsynced_local_edits_become_conflicts():
+    old = sheet([("a", "", True), ("b", "", True)])
+    new = sheet([("a", "remote", False)])
+    table, id_index, facets = session_table(old)
+    table.at[id_index["a"], "Comment"] = "mine"
+    table.at[id_index["b"], "Comment"] = "mine too"
+    snapshot = row_snapshot(new, "ID", COLS)
+    diff = diff_snapshots(row_snapshot(old, "ID", COLS), snapshot)
+
+    _, changed, conflicts = reconcile(table, None, id_index, facets, new, snapshot, diff, {"a", "b"}, "ID", "Comment")
+
+    assert changed == 0
+    assert table.at[id_index["a"], "Comment"] == "mine"
+    assert {c["ID"]: c["Sheet Comment"] for c in conflicts} == {"a": "remote", "b": None}
+
+
+def test_remote_change_matching_local_edit_is_not_a_conflict():
+    old = sheet([("a", "", True)])
+    new = sheet([("a", "same", True)])
+    table, id_index, facets = session_table(old)
+    table.at[id_index["a"], "Comment"] = "same"
+    snapshot = row_snapshot(new, "ID", COLS)
+    diff = diff_snapshots(row_snapshot(old, "ID", COLS), snapshot)
+
+    _, changed, conflicts = reconcile(table, None, id_index, facets, new, snapshot, diff, {"a"}, "ID", "Comment")
+    assert (changed, conflicts) == (0, [])
+
+
+def test_updates_reach_rows_in_the_append_buffer():
+    old = sheet([("a", "", True)])
+    table, id_index, facets = session_table(old)
+    new = sheet([("a", "", True), ("b", "", True)])
+    snapshot = row_snapshot(new, "ID", COLS)
+    buffer, _, _ = reconcile(table, None, id_index, facets, new, snapshot,
+                             diff_snapshots(row_snapshot(old, "ID", COLS), snapshot), set(), "ID", "Comment")
+
+    newer = sheet([("a", "", True), ("b", "spam", False)])
+    newer_snapshot = row_snapshot(newer, "ID", COLS)
+    buffer, changed, _ = reconcile(table, buffer, id_index, facets, newer, newer_snapshot,
+                                   diff_snapshots(snapshot, newer_snapshot), set(), "ID", "Comment")
+    assert changed == 1
+    assert buffer.at[id_index["b"], "Comment"] == "spam"
@@ -0,0 +1,71 @@
+import threading
+
+import pandas as pd
+
+from id_codes import ID_CODE, add_id_codes
+
+
+def counting_loader(frames):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [frame.copy() for frame in frames]
+    return loader, calls
+
+
+def test_loads_once_while_fresh(shared_db):
+    loader, calls = counting_loader([pd.DataFrame({"ID": ["a", "b"], "n": [1, 2]})])
+    first = shared_db.shared_frames("k", 60, loader)
+    second = shared_db.shared_frames("k", 60, loader)
+    assert len(calls) == 1
+    assert first[0] == second[0]
+    pd.testing.assert_frame_equal(second[1][0], pd.DataFrame({"ID": ["a", "b"], "n": [1, 2]}))
+
+
+def test_stored_frames_decode_with_fresh_id_codes(shared_db):
+    frame = add_id_codes(pd.DataFrame({"ID": ["a", "b"]}))
+    loader, _ = counting_loader([frame])
+    version, _ = shared_db.shared_frames("k", 60, loader)
+    shared_db._memo.clear()  # as if read by another process
+
+    decoded = shared_db._frames("k", version)[0]
+    assert list(decoded[ID_CODE]) == list(frame[ID_CODE])
+
+
+def test_invalidate_forces_reload_and_version_tracks_content(shared_db):
+    rows = [pd.DataFrame({"ID": ["a"]})]
+    loader, calls = counting_loader(rows)
+    version, _ = shared_db.shared_frames("k", 60, loader)
+    shared_db.invalidate("k")
+    assert shared_db.shared_frames("k", 60, loader)[0] == version
+    assert len(calls) == 2
+
+    rows[0] = pd.DataFrame({"ID": ["b"]})
+    shared_db.invalidate("k")
+    assert shared_db.shared_frames("k", 60, loader)[0] != version
+
+
+def test_unstorable_frames_are_kept_locally(shared_db):
+    loader, calls = counting_loader([pd.DataFrame({"mixed": [1, "a", 2.5]})])
+    version, frames = shared_db.shared_frames("k", 60, loader)
+    assert version is not None
+    assert shared_db.shared_frames("k", 60, loader) == (version, frames)
+    assert len(calls) == 1
+
+
+def test_threads_share_one_connection(shared_db):
+    conns = []
+    threads = [threading.Thread(target=lambda: conns.append(shared_db._connect())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(map(id, conns))) == 1
+    loader, _ = counting_loader([pd.DataFrame({"ID": ["a"]})])
+    version, _ = shared_db.shared_frames("k", 60, loader)
+    other = []
+    t = threading.Thread(target=lambda: other.append(shared_db.shared_frames("k", 60, loader)[0]))
+    t.start()
+    t.join()
+    assert other == [version]
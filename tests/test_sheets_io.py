@@ -0,0 +1,82 @@
+import pytest
+
+import sheets_io
+
+
+class FakeWorksheet:
+    spreadsheet_id = "sheet"
+    id = 1
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.full_reads = 0
+
+    @property
+    def row_count(self):
+        return len(self.rows)
+
+    @property
+    def col_count(self):
+        return max(len(r) for r in self.rows)
+
+    def get_all_values(self):
+        self.full_reads += 1
+        return [list(r) for r in self.rows]
+
+    def batch_get(self, ranges):
+        start = int(ranges[1][1:].split(":")[0])
+        return [[list(self.rows[0])], [list(r) for r in self.rows[start - 1:]]]
+
+
+@pytest.fixture
+def ws(shared_db):
+    return FakeWorksheet([["ID", "Comment"]] + [[f"id{i}", ""] for i in range(50)])
+
+
+def read(ws):
+    return sheets_io.fetch_values([ws], incremental=True)[0]
+
+
+def test_appended_rows_are_fetched_without_full_reload(ws):
+    read(ws)
+    ws.rows.append(["new", "x"])
+    assert read(ws)[-1] == ["new", "x"]
+    assert ws.full_reads == 1
+
+
+def test_edit_in_boundary_window_reloads_in_full(ws):
+    read(ws)
+    ws.rows[-1] = ["id49", "edited"]
+    assert read(ws)[-1] == ["id49", "edited"]
+    assert ws.full_reads == 2
+
+def test_tail_is_shared_between_processes(ws, shared_db):
+    read(ws)
+    shared_db._tail_memo.clear()  # as if read by another replica
+    ws.rows.append(["new", "x"])
+    assert read(ws)[-1] == ["new", "x"]
+    assert ws.full_reads == 1
+
+
+def test_forgotten_or_invalidated_tail_reloads_in_full(ws, shared_db):
+    read(ws)
+    ws.rows[1] = ["id0", "edited"]
+    ws.rows.append(["new", "x"])
+    # An edit above the boundary window is not seen by a tail read
+    assert read(ws)[1] == ["id0", ""]
+
+    shared_db.invalidate("frames")
+    assert read(ws)[1] == ["id0", "edited"]
+    assert ws.full_reads == 2
+
+    ws.rows[2] = ["id1", "edited"]
+    sheets_io.forget_tail(ws)
+    assert read(ws)[2] == ["id1", "edited"]
+
+
+def test_tail_dropped_during_a_read_is_not_restored(ws, shared_db):
+    key = sheets_io._tail_key(ws)
+    _, _, stamp = shared_db.read_tail(key)
+    shared_db.drop_tails(key)
+    shared_db.write_tail(key, [["ID"], ["stale"]], 0.0, stamp)
+    assert shared_db.read_tail(key)[0] is None
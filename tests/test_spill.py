@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+import spill
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    """Run spill bookkeeping against plain dicts standing in for session state."""
+    monkeypatch.setattr(spill, "_sessions", {})
+    monkeypatch.setattr(spill, "SPILL_DIR", str(tmp_path))
+    states = {"a": {}, "b": {}}
+    current = ["a"]
+    monkeypatch.setattr(spill, "_current", lambda: (current[0], states[current[0]]))
+
+    def switch(session_id):
+        current[0] = session_id
+        return states[session_id]
+    return switch
+
+
+def test_idle_sessions_are_spilled_over_budget_and_restored(sessions, monkeypatch):
+    monkeypatch.setattr(spill, "MEMORY_BUDGET_MB", 0)
+    monkeypatch.setattr(spill, "SPILL_IDLE_SECONDS", 0)
+    state_a = sessions("a")
+    state_a["df"] = pd.DataFrame({"ID": ["x", "y"], "n": [1, 2]})
+    assert spill.track_session(["df"]) > 0
+
+    sessions("b")["df"] = pd.DataFrame({"ID": ["z"], "n": [3]})
+    spill.track_session(["df"])
+    assert isinstance(state_a["df"], spill.Spilled)
+
+    sessions("a")
+    spill.touch()
+    pd.testing.assert_frame_equal(state_a["df"], pd.DataFrame({"ID": ["x", "y"], "n": [1, 2]}))
+
+
+def test_sessions_within_budget_stay_in_memory(sessions):
+    state_a = sessions("a")
+    state_a["df"] = pd.DataFrame({"ID": ["x"]})
+    spill.track_session(["df"])
+    sessions("b")["df"] = pd.DataFrame({"ID": ["z"]})
+    spill.track_session(["df"])
+    assert isinstance(state_a["df"], pd.DataFrame)
+    assert spill.total_bytes() > 0
+
+
+def count_measurements(monkeypatch):
+    calls = []
+    measure = spill._frame_bytes
+    monkeypatch.setattr(spill, "_frame_bytes", lambda value: calls.append(1) or measure(value))
+    return calls
+
+
+def test_same_frame_is_not_measured_every_rerun(sessions, monkeypatch):
+    state = sessions("a")
+    state["df"] = pd.DataFrame({"ID": ["a"] * 1000})
+    calls = count_measurements(monkeypatch)
+
+    first = spill.track_session(["df"])
+    assert first > 0
+    assert spill.track_session(["df"]) == first
+    assert len(calls) == 1
+
+    state["df"] = pd.DataFrame({"ID": ["a"] * 10})
+    assert spill.track_session(["df"]) < first
+    assert len(calls) == 2
+
+
+def test_frames_are_re_measured_after_the_interval(sessions, monkeypatch):
+    sessions("a")["df"] = pd.DataFrame({"ID": ["a"]})
+    calls = count_measurements(monkeypatch)
+    spill.track_session(["df"])
+    monkeypatch.setattr(spill, "MEASURE_INTERVAL_SECONDS", 0)
+    spill.track_session(["df"])
+    assert len(calls) == 2
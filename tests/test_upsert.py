@@ -0,0 +1,43 @@
+import pandas as pd
+
+from facets import FacetIndex
+import upsert
+from upsert import compact, dead_rows, dedupe_batch, needs_compaction, select_rows, upsert_rows
+
+
+def test_dedupe_batch_canonicalizes_and_keeps_last():
+    rows = pd.DataFrame({"ID": ["@Foo", "foo", "", "bar"], "Comment": ["1", "2", "3", "4"]})
+    deduped, dropped = dedupe_batch(rows, "ID")
+    assert list(deduped["ID"]) == ["foo", "bar"]
+    assert list(deduped["Comment"]) == ["2", "4"]
+    assert dropped == 1
+
+
+def test_upsert_updates_in_place_and_buffers_new_rows():
+    base = pd.DataFrame({"ID": ["a", "b"], "Comment": ["", ""], "Credibility": [True, True]})
+    id_index = {"a": 0, "b": 1}
+    facets = FacetIndex(base)
+    rows = pd.DataFrame({"ID": ["b", "c"], "Comment": ["spam", "new"], "Credibility": [False, True]})
+
+    buffer, added, updated = upsert_rows(base, None, id_index, facets, rows, "ID", "Comment")
+
+    assert [r["ID"] for r in added] == ["c"] and [r["ID"] for r in updated] == ["b"]
+    assert base.at[1, "Comment"] == "spam"
+    assert list(buffer.index) == [-1] and id_index["c"] == -1
+    assert facets.count(False) == 1 and facets.count(True) == 2
+
+    table = compact(base, buffer)
+    assert list(table["ID"]) == ["c", "a", "b"]
+    assert list(select_rows(base, buffer, [-1, 1])["ID"]) == ["c", "b"]
+
+
+def test_tombstones_are_compacted_past_the_limit(monkeypatch):
+    base = pd.DataFrame({"ID": ["a", "b", "c"], "Comment": ["", "", ""], "Credibility": [True, True, False]})
+    facets = FacetIndex(base)
+    facets.remove(1)
+    monkeypatch.setattr(upsert, "ADD_BUFFER_LIMIT", 1)
+    assert dead_rows(base, None, facets) == 1 and not needs_compaction(base, None, facets)
+
+    facets.remove(2)
+    assert needs_compaction(base, None, facets)
+    assert list(compact(base, None, facets)["ID"]) == ["a"]
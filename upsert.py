@@ -0,0 +1,92 @@
+import bisect
+
+import pandas as pd
+
+from id_codes import canonical_ids
+
+# ---------------- Append Buffer Config ----------------
+ADD_BUFFER_LIMIT = 1000  # fold buffered rows into the base table past this size
+
+
+# ---------------- Batch De-duplication ----------------
+def dedupe_batch(rows, id_col):
+    """Canonicalize IDs, drop blank ones and keep the last row per ID. Returns (rows, duplicates dropped)."""
+    rows = rows.copy()
+    rows[id_col] = canonical_ids(rows[id_col])
+    rows = rows[rows[id_col] != ""]
+    deduped = rows.drop_duplicates(id_col, keep="last")
+    return deduped, len(rows) - len(deduped)
+
+
+# ---------------- ID-keyed Upsert ----------------
+def first_label(base, buffer):
+    """Lowest label in use. Tables are kept in label order, so it is the first row."""
+    if buffer is not None and not buffer.empty:
+        return buffer.index[0]
+    return base.index[0] if not base.empty else 0
+
+
+def locate(base, buffer, label):
+    """The frame (base or append buffer) holding `label`."""
+    if buffer is not None and label in buffer.index:
+        return buffer
+    return base
+
+
+def upsert_rows(base, buffer, id_index, facets, rows, id_col, comment_col, cred_col="Credibility"):
+    """
+    Update IDs already in the table in place and put new IDs in the append
+    buffer, so the base table is never copied. `rows` must already be
+    de-duplicated. Returns (buffer, added rows, updated rows).
+    """
+    new_rows, updated = [], []
+    for row in rows.to_dict("records"):
+        row_id = str(row[id_col])
+        label = id_index.get(row_id)
+        if label is None:
+            new_rows.append(row)
+            continue
+        frame = locate(base, buffer, label)
+        frame.at[label, comment_col] = row.get(comment_col)
+        frame.at[label, cred_col] = row[cred_col]
+        facets.update(label, row[cred_col], row.get(comment_col))
+        updated.append(row)
+
+    if new_rows:
+        start = first_label(base, buffer) - len(new_rows)
+        labels = range(start, start + len(new_rows))
+        for label, row in zip(labels, new_rows):
+            id_index[str(row[id_col])] = label
+            facets.add(label, row[cred_col], row.get(comment_col))
+        added = pd.DataFrame(new_rows, index=labels, columns=base.columns)
+        buffer = added if buffer is None or buffer.empty else pd.concat([added, buffer])
+
+    return buffer, new_rows, updated
+
+
+def dead_rows(base, buffer, facets):
+    """Number of tombstones: rows still in the frames but no longer in `facets`."""
+    return len(base) + (len(buffer) if buffer is not None else 0) - len(facets)
+
+
+def needs_compaction(base, buffer, facets):
+    """True once the append buffer or the tombstones grow past ADD_BUFFER_LIMIT."""
+    return (len(buffer) if buffer is not None else 0) > ADD_BUFFER_LIMIT or dead_rows(base, buffer, facets) > ADD_BUFFER_LIMIT
+
+
+def compact(base, buffer, facets=None):
+    """Fold the append buffer into the base table, dropping tombstones if `facets` is given."""
+    table = base if buffer is None or buffer.empty else pd.concat([buffer, base])
+    if facets is not None and len(table) != len(facets):
+        table = table[table.index.isin(list(facets.rows))]
+    return table
+
+
+def select_rows(base, buffer, labels=None):
+    """Rows for sorted `labels` (all rows if None) across buffer and base, in table order."""
+    if buffer is None or buffer.empty:
+        return base.copy() if labels is None else base.loc[labels].copy()
+    if labels is None:
+        return pd.concat([buffer, base])
+    split = bisect.bisect_left(labels, buffer.index[-1] + 1)
+    return pd.concat([buffer.loc[labels[:split]], base.loc[labels[split:]]])
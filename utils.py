@@ -1,9 +1,12 @@
-import gspread
 import pandas as pd
 from google.oauth2.service_account import Credentials
 import streamlit as st
 import time
 from functools import wraps
+import sheets_io
+import sheets_pool
+from shards import open_table
+from persian import add_gregorian_dates, normalize_digits
 
 # ---------------- Google Sheets API Scopes ----------------
 SCOPE = [
@@ -27,19 +30,24 @@ def retry_on_failure(max_retries=3, delay=1):
     return decorator
 
 # ---------------- Google Sheets Client ----------------
-@st.cache_resource(show_spinner=False)
+def service_account_credentials():
+    """Service account credentials from Streamlit secrets."""
+    return Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"], scopes=SCOPE
+    )
+
+def get_client_pool():
+    return sheets_pool.get_client_pool(service_account_credentials)
+
 @retry_on_failure(max_retries=3)
 def get_gsheets_client():
     """
-    Authorize and return a gspread client with retry logic.
-    Requires service account JSON in Streamlit secrets.
+    Return the pooled gspread client with retry logic.
+    Requires service account JSON in Streamlit secrets. A failed
+    authentication is not cached, so the next call tries again.
     """
     try:
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"], scopes=SCOPE
-        )
-        client = gspread.authorize(creds)
-        return client
+        return get_client_pool().client()
     except Exception as e:
         st.error(f"❌ Failed to authenticate with Google Sheets: {str(e)}")
         return None
@@ -48,30 +56,58 @@ def get_gsheets_client():
 @retry_on_failure(max_retries=2)
 def get_worksheet_by_key(client, sheet_id, worksheet_name):
     """Get worksheet with error handling and retry logic."""
+    return get_worksheets_by_key(client, sheet_id, [worksheet_name])[worksheet_name]
+
+@retry_on_failure(max_retries=2)
+def get_worksheets_by_key(client, sheet_id, worksheet_names):
+    """Get several worksheets from the pooled handle cache (metadata is re-read once per TTL)."""
+    if client is None:
+        return dict.fromkeys(worksheet_names)
     try:
-        sheet = client.open_by_key(sheet_id)
-        return sheet.worksheet(worksheet_name)
-    except gspread.WorksheetNotFound:
-        st.error(f"❌ Worksheet '{worksheet_name}' not found in sheet ID {sheet_id}")
-        return None
+        found = get_client_pool().worksheets(sheet_id, client)
     except Exception as e:
         st.error(f"❌ Failed to access worksheet: {str(e)}")
-        return None
+        return dict.fromkeys(worksheet_names)
+    # Sharded tables come back as one ShardedTable
+    tables = {name: open_table(found, name) for name in worksheet_names}
+    for name, table in tables.items():
+        if table is None:
+            st.error(f"❌ Worksheet '{name}' not found in sheet ID {sheet_id}")
+    return tables
+
+def values_to_df(data):
+    """Build an optimized DataFrame from raw sheet values (header row first)."""
+    if not data or len(data) <= 1:
+        return pd.DataFrame()
+
+    headers = make_unique_headers(data[0])
+    df = pd.DataFrame(data[1:], columns=headers)
+
+    # Persian digits would defeat numeric conversion; Jalali dates get a Gregorian twin
+    df = add_gregorian_dates(normalize_digits(df))
+    return optimize_dataframe(df)
 
 def load_worksheet_df(worksheet):
     """Load worksheet data into DataFrame with optimized parsing."""
+    return load_worksheet_dfs([worksheet])[0]
+
+def load_worksheet_dfs(worksheets, incremental=False):
+    """
+    Load several worksheets concurrently; large ones are read in parallel chunks.
+    With `incremental`, sheets loaded before only fetch their appended rows.
+    """
+    frames = [pd.DataFrame() for _ in worksheets]
+    present = [i for i, ws in enumerate(worksheets) if ws is not None]
     try:
-        data = worksheet.get_all_values()
-        if not data or len(data) <= 1:
-            return pd.DataFrame()
-        
-        headers = make_unique_headers(data[0])
-        df = pd.DataFrame(data[1:], columns=headers)
-        
-        return optimize_dataframe(df)
+        values = sheets_io.fetch_values((worksheets[i] for i in present), incremental=incremental)
     except Exception as e:
+        get_client_pool().report_failure(e)
         st.error(f"❌ Failed to load data from worksheet: {str(e)}")
-        return pd.DataFrame()
+        return frames
+    get_client_pool().report_success()
+    for i, data in zip(present, values):
+        frames[i] = values_to_df(data)
+    return frames
 
 # ---------------- DataFrame Utils ----------------
 def make_unique_headers(headers):
@@ -95,3 +131,23 @@ def optimize_dataframe(df):
             if df[col].dtype == "object" and df[col].nunique() / len(df) < 0.5:
                 df[col] = df[col].astype("category")
     return df
+
+# ---------------- Write-Behind Results ----------------
+def report_sync_tickets(write_queue, on_done, on_error=None):
+    """
+    Report this session's finished write-behind tickets (st.session_state.sync_tickets):
+    a toast and on_done(ticket) for each success, on_error(ticket) and an error for each failure.
+    """
+    for ticket in list(st.session_state.sync_tickets):
+        status = write_queue.status(ticket)
+        if status == "pending":
+            continue
+        st.session_state.sync_tickets.remove(ticket)
+        write_queue.forget(ticket)
+        if status == "done":
+            st.toast("✔️ Google Sheet updated successfully!")
+            on_done(ticket)
+        else:
+            if on_error is not None:
+                on_error(ticket)
+            st.error(f"❌ Failed to update Google Sheet: {status}")
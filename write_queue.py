@@ -0,0 +1,130 @@
+import itertools
+import threading
+
+from gspread.utils import rowcol_to_a1
+
+from id_codes import canonical_id, canonical_ids
+from process_state import process_singleton
+from shards import ShardedTable
+from sheets_io import forget_tail, run_concurrently
+
+# ---------------- Write-Behind Config ----------------
+WRITE_BEHIND_INTERVAL = 2  # seconds between flushes
+
+
+# ---------------- Write-Behind Queue ----------------
+class WriteBehindQueue:
+    """
+    Queue of row upserts keyed by worksheet and ID, shared process-wide.
+    Any session can submit rows and get a ticket back immediately; a background
+    thread coalesces repeated writes to the same ID and flushes each worksheet
+    with one batch_update for existing IDs and one append_rows for new ones.
+    """
+
+    def __init__(self, interval=WRITE_BEHIND_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}   # ws key -> {"ws", "id_col", "rows": {id: values}, "tickets", callbacks}
+        self._status = {}    # ticket -> "pending" | "done" | error message
+        self._tickets = itertools.count(1)
+        self._thread = None
+
+    def submit(self, worksheet, id_col, rows, on_done=None, on_error=None):
+        """Queue rows (dicts of column -> value) for upsert and return a ticket."""
+        ticket = next(self._tickets)
+        key = (worksheet.spreadsheet_id, worksheet.id)
+        with self._lock:
+            batch = self._pending.setdefault(key, {
+                "ws": worksheet, "id_col": id_col, "rows": {},
+                "tickets": [], "on_done": [], "on_error": []
+            })
+            for row in rows:
+                row_id = canonical_id(row[id_col])
+                batch["rows"][row_id] = {**batch["rows"].get(row_id, {}), **row, id_col: row_id}
+            batch["tickets"].append(ticket)
+            if on_done:
+                batch["on_done"].append(on_done)
+            if on_error:
+                batch["on_error"].append(on_error)
+            self._status[ticket] = "pending"
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+        return ticket
+
+    def status(self, ticket):
+        """"pending", "done", or the error message of a failed flush."""
+        with self._lock:
+            return self._status.get(ticket, "done")
+
+    def forget(self, ticket):
+        with self._lock:
+            self._status.pop(ticket, None)
+
+    def flush_now(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                batches, self._pending = self._pending, {}
+            for batch in batches.values():
+                try:
+                    self._flush(batch)
+                except Exception as e:
+                    result, callbacks = f"{e}", batch["on_error"]
+                else:
+                    result, callbacks = "done", batch["on_done"]
+                for callback in callbacks:
+                    try:
+                        callback()
+                    except Exception:
+                        pass
+                with self._lock:
+                    for ticket in batch["tickets"]:
+                        self._status[ticket] = result
+
+    @classmethod
+    def _flush(cls, batch):
+        ws, id_col, rows = batch["ws"], batch["id_col"], batch["rows"]
+        # A sharded table writes each row to its owning shard only
+        parts = ws.partition(rows) if isinstance(ws, ShardedTable) else [(ws, rows)]
+        for shard, shard_rows in parts:
+            cls._flush_worksheet(shard, id_col, shard_rows)
+
+    @staticmethod
+    def _flush_worksheet(ws, id_col, rows):
+        header = ws.row_values(1)
+        id_idx = header.index(id_col) + 1
+        # Match on canonical IDs so "@Name" or a profile URL in the sheet is found
+        sheet_ids = canonical_ids(ws.col_values(id_idx)[1:])
+        row_of = {v: i + 2 for i, v in enumerate(sheet_ids)}
+
+        updates, appends = [], []
+        for row_id, values in rows.items():
+            row = row_of.get(row_id)
+            if row is None:
+                appends.append([values.get(h, "") for h in header])
+                continue
+            for col, value in values.items():
+                if col != id_col and col in header:
+                    updates.append({"range": rowcol_to_a1(row, header.index(col) + 1), "values": [[value]]})
+
+        # Updates touch existing rows only, so both writes go out together
+        writes = []
+        if updates:
+            writes.append((ws.batch_update, (updates,), {"value_input_option": "USER_ENTERED"}))
+        if appends:
+            writes.append((ws.append_rows, (appends,), {"value_input_option": "USER_ENTERED"}))
+        run_concurrently(writes)
+        if updates:
+            # Edits above the tail are invisible to incremental reads
+            forget_tail(ws)
+
+
+@process_singleton
+def get_write_queue():
+    return WriteBehindQueue()